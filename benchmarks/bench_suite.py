@@ -0,0 +1,214 @@
+"""Time the core operations on the synthetic corpora and compare runs.
+
+Usage: python benchmarks/bench_suite.py [--scale S] [--repeat N] [--only NAME]
+                                        [--label L] [--compare results/OLD.json]
+
+Each benchmark calls the same GUI-free function the application uses:
+merge_pdfs, reverse_pdf, the editor's thumbnail renderer, assemble_pages
+(the page editor's save) and sign_pdf (the signer's save). Results are
+written to benchmarks/results/<label>.json. With --compare, every timing is
+shown next to the stored one with the relative change, and the exit
+status is 1 if any benchmark got slower by more than NOISE_THRESHOLD.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import pdf_core  # noqa: E402
+from corpus import DEFAULT_CACHE_DIR, build_corpus, signature_image  # noqa: E402
+from pdf_render import render_thumbnail_batch  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# Changes smaller than this are reported as noise in comparisons
+NOISE_THRESHOLD = 0.05
+
+
+def page_count(paths):
+    total = 0
+    for path in paths:
+        with fitz.open(path) as doc:
+            total += len(doc)
+    return total
+
+
+def editor_pages(paths, seed="editor"):
+    """A deterministic editor session: pages of several files, shuffled in blocks"""
+    pages = []
+    for path in paths:
+        pages.extend(pdf_core.parse_page_spec(path))
+    rng = random.Random(seed)
+    blocks = [pages[i:i + 5] for i in range(0, len(pages), 5)]
+    rng.shuffle(blocks)
+    return [page for block in blocks for page in reversed(block)]
+
+
+def benchmarks(scale, cache_dir):
+    """Benchmark name -> (function(output_path), pages processed per run)"""
+    text = build_corpus("text", scale, cache_dir)
+    scans = build_corpus("scans", scale, cache_dir)
+    small = build_corpus("small", scale, cache_dir)
+    huge = build_corpus("huge", scale, cache_dir)
+    mixed = build_corpus("mixed", scale, cache_dir)
+    signature = signature_image(cache_dir)
+
+    huge_pages = page_count(huge[:1])
+    signed_pages = {n: (400, 700, 550, 760) for n in range(0, huge_pages, 10)}
+    session = editor_pages(mixed + scans)
+
+    def thumbnails(paths):
+        def run(output_path):
+            # A cache of its own in the run's work directory, emptied after every run,
+            # so each run renders every page and the user's cache is left alone
+            cache_dir = os.path.join(os.path.dirname(output_path), "thumbnail-cache")
+            for path in paths:
+                with fitz.open(path) as doc:
+                    page_nums = range(len(doc))
+                render_thumbnail_batch("pdf", path, page_nums, cache_dir=cache_dir)
+        return run
+
+    return {
+        "merge/text": (lambda out: pdf_core.merge_pdfs(text, out), page_count(text)),
+        "merge/small-files": (lambda out: pdf_core.merge_pdfs(small, out), page_count(small)),
+        "merge/mixed": (lambda out: pdf_core.merge_pdfs(mixed, out), page_count(mixed)),
+        "merge/small-optimized": (lambda out: pdf_core.merge_pdfs(small, out, optimize="standard"),
+                                  page_count(small)),
+        "reverse/huge": (lambda out: pdf_core.reverse_pdf(huge[0], out), huge_pages),
+        "reverse/huge-full-save": (lambda out: pdf_core.reverse_pdf(huge[0], out, incremental=False),
+                                   huge_pages),
+        "reverse/huge-linearized": (lambda out: pdf_core.reverse_pdf(huge[0], out, linearize=True), huge_pages),
+        "reverse/scans": (lambda out: pdf_core.reverse_pdf(scans[0], out), page_count(scans[:1])),
+        "thumbnails/mixed": (thumbnails(mixed[:2]), page_count(mixed[:2])),
+        "thumbnails/scans": (thumbnails(scans[:1]), page_count(scans[:1])),
+        "editor-save/mixed": (lambda out: pdf_core.assemble_pages(session, out), len(session)),
+        "sign/huge": (lambda out: pdf_core.sign_pdf(huge[0], signature, signed_pages, out), huge_pages),
+        "sign/huge-full-save": (lambda out: pdf_core.sign_pdf(huge[0], signature, signed_pages, out,
+                                                              incremental=False), huge_pages),
+    }
+
+
+def time_benchmark(func, repeat, work_dir):
+    """Run func `repeat` times after one warm-up run; return the timings"""
+    output_path = os.path.join(work_dir, "out.pdf")
+    timings = []
+    for attempt in range(repeat + 1):
+        fitz.TOOLS.store_shrink(100)  # Start every run with an empty MuPDF cache
+        start = time.perf_counter()
+        func(output_path)
+        elapsed = time.perf_counter() - start
+        clear_directory(work_dir)
+        if attempt:
+            timings.append(elapsed)
+    return timings
+
+
+def clear_directory(path):
+    """Remove everything a run left in the work directory"""
+    for entry in os.scandir(path):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path)
+        else:
+            os.remove(entry.path)
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def median_change(name, result, baseline):
+    """Relative change of the median against the baseline, or None if it has no such benchmark"""
+    old = baseline.get("results", {}).get(name)
+    if not old:
+        return None
+    return result["median"] / old["median"] - 1
+
+
+def compare_line(name, result, baseline):
+    line = f"{name:24} {result['median'] * 1000:9.1f} ms  {result['pages'] / result['median']:9.0f} pages/s"
+    change = median_change(name, result, baseline)
+    if change is None:
+        return line + "  (new)"
+    old = baseline["results"][name]
+    verdict = "~" if abs(change) < NOISE_THRESHOLD else "slower" if change > 0 else "faster"
+    return line + f"  was {old['median'] * 1000:9.1f} ms  {change:+7.1%} {verdict}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="Corpus size multiplier (default: 1.0)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (default: 3)")
+    parser.add_argument("--only", action="append", default=[], metavar="NAME",
+                        help="Run benchmarks whose name contains NAME (may be repeated)")
+    parser.add_argument("--label", help="Results file name (default: git revision or timestamp)")
+    parser.add_argument("--compare", metavar="JSON", help="Earlier results to compare against")
+    parser.add_argument("--corpus-dir", default=DEFAULT_CACHE_DIR, help="Where corpora are cached")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("scale") != args.scale:
+            print(f"Warning: {args.compare} was measured at scale {baseline.get('scale')}, not {args.scale}")
+
+    print("Preparing corpora...")
+    selected = {name: bench for name, bench in benchmarks(args.scale, args.corpus_dir).items()
+                if not args.only or any(part in name for part in args.only)}
+
+    revision = git_revision()
+    report = {
+        "label": args.label or revision or time.strftime("%Y%m%d-%H%M%S"),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": revision,
+        "python": platform.python_version(),
+        "pymupdf": fitz.VersionBind,
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        "scale": args.scale,
+        "repeat": args.repeat,
+        "results": {},
+    }
+
+    work_dir = tempfile.mkdtemp(prefix="pdf-wizard-bench-")
+    try:
+        for name, (func, pages) in selected.items():
+            timings = time_benchmark(func, args.repeat, work_dir)
+            result = {"runs": timings, "min": min(timings), "median": statistics.median(timings),
+                      "pages": pages}
+            report["results"][name] = result
+            print(compare_line(name, result, baseline))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    results_path = os.path.join(RESULTS_DIR, f"{report['label']}.json")
+    with open(results_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {results_path}")
+
+    slower = [name for name, result in report["results"].items()
+              if (median_change(name, result, baseline) or 0) >= NOISE_THRESHOLD]
+    if slower:
+        print(f"Slower than {args.compare}: {', '.join(slower)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
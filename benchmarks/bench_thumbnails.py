@@ -0,0 +1,100 @@
+"""Compare the original thumbnail path with the direct-to-size renderer.
+
+Usage: python benchmarks/bench_thumbnails.py [file.pdf ...] [--pages N] [--kind text|scan]
+
+Without files, a synthetic document of text pages (or, with --kind scan,
+full-page JPEG scans) is generated. For each method the script reports
+milliseconds per page and the speedup over the original path (render at
+1.0, PPM encode, decode, LANCZOS shrink).
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_render import THUMBNAIL_SIZE, fit_thumbnail, render_thumbnail  # noqa: E402
+
+
+def legacy_thumbnail(page, size=THUMBNAIL_SIZE):
+    """The editor's original thumbnail code, kept here as the baseline"""
+    mat = fitz.Matrix(1.0, 1.0)
+    pix = page.get_pixmap(matrix=mat)
+    img_data = pix.tobytes("ppm")
+    img = Image.open(io.BytesIO(img_data))
+    return fit_thumbnail(img, size)
+
+
+METHODS = {
+    "legacy (1.0 + ppm)": legacy_thumbnail,
+    "direct": lambda page: render_thumbnail(page),
+    "direct draft": lambda page: render_thumbnail(page, draft=True),
+}
+
+
+def synthetic_pdf(path, pages, kind="text"):
+    """Write a letter-size document of dense text pages or of 300 dpi scans"""
+    with fitz.open() as doc:
+        noise = Image.effect_noise((2550, 3300), 60).convert("RGB") if kind == "scan" else None
+        for i in range(pages):
+            page = doc.new_page(width=612, height=792)
+            if noise is not None:
+                # A distinct image per page, so MuPDF cannot reuse one decode
+                scan = noise.copy()
+                ImageDraw.Draw(scan).text((200, 200), f"Page {i + 1}", fill="black")
+                buffer = io.BytesIO()
+                scan.save(buffer, "JPEG", quality=85)
+                page.insert_image(page.rect, stream=buffer.getvalue())
+                continue
+            page.insert_text((72, 72), f"Page {i + 1}", fontsize=24)
+            body = " ".join(f"word{j}" for j in range(400))
+            page.insert_textbox(fitz.Rect(72, 100, 540, 700), body, fontsize=9)
+            page.draw_rect(fitz.Rect(60, 60, 552, 732), color=(0.2, 0.4, 0.8), width=2)
+            page.draw_circle((306, 740), 20, color=(0.8, 0.2, 0.2), fill=(1, 0.9, 0.9))
+        doc.save(path)
+
+
+def time_method(method, doc, pages):
+    start = time.perf_counter()
+    for page_num in range(pages):
+        method(doc[page_num])
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="*", help="PDFs to render (default: a synthetic document)")
+    parser.add_argument("--pages", type=int, default=50, help="Pages per document (default: 50)")
+    parser.add_argument("--kind", choices=("text", "scan"), default="text",
+                        help="Content of the synthetic document (default: text)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = args.pdfs
+        if not paths:
+            paths = [os.path.join(temp_dir, "synthetic.pdf")]
+            synthetic_pdf(paths[0], args.pages, args.kind)
+
+        for path in paths:
+            with fitz.open(path) as doc:
+                pages = min(args.pages, len(doc))
+                print(f"{os.path.basename(path)}: {pages} pages at {THUMBNAIL_SIZE[0]}x{THUMBNAIL_SIZE[1]}")
+                baseline = None
+                for name, method in METHODS.items():
+                    method(doc[0])  # Warm up fonts
+                    fitz.TOOLS.store_shrink(100)  # Don't reuse images decoded by the previous method
+                    elapsed = time_method(method, doc, pages)
+                    if baseline is None:
+                        baseline = elapsed
+                    print(f"  {name:20} {elapsed / pages * 1000:7.2f} ms/page  "
+                          f"{baseline / elapsed:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
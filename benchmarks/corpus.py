@@ -0,0 +1,152 @@
+"""Deterministic synthetic PDF corpora for the benchmarks.
+
+Every corpus is generated offline from a fixed seed, so two machines (or two
+runs) get the same pages, and a timing change can be attributed to the code
+rather than the inputs. Corpora are cached in a directory named after the
+corpus version and scale and are only rebuilt when those change.
+
+Usage: python benchmarks/corpus.py [--scale S] [--dir DIR]
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+
+import fitz  # PyMuPDF
+from PIL import Image, ImageDraw
+
+# Bump when the generated content changes, so stale caches are not reused
+CORPUS_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "pdf-wizard-bench")
+
+PAGE_SIZES = {
+    "letter": (612, 792),
+    "a4": (595, 842),
+    "a3": (842, 1191),
+    "legal": (612, 1008),
+    "letter-landscape": (792, 612),
+    "receipt": (227, 600),
+}
+
+# Scans are rendered at this resolution (pixels per point)
+SCAN_SCALE = 150 / 72
+
+# Corpus name -> (number of files, pages per file, page kind, what --scale grows)
+CORPORA = {
+    "text": (4, 50, "text", "files"),
+    "scans": (2, 10, "scan", "files"),
+    "small": (200, 2, "text", "files"),
+    "huge": (2, 1500, "text", "pages"),
+    "mixed": (6, 20, "mixed", "files"),
+}
+
+
+def scaled(count, scale):
+    return max(1, int(round(count * scale)))
+
+
+def text_page(doc, rng, size=PAGE_SIZES["letter"]):
+    """A page of dense text with a few vector shapes"""
+    width, height = size
+    page = doc.new_page(width=width, height=height)
+    page.insert_text((36, 48), f"Section {rng.randrange(1000)}", fontsize=18)
+    words = " ".join(f"word{rng.randrange(10000)}" for _ in range(int(width * height / 1200)))
+    page.insert_textbox(fitz.Rect(36, 64, width - 36, height - 60), words, fontsize=8)
+    for _ in range(3):
+        x, y = rng.uniform(36, width - 80), rng.uniform(64, height - 80)
+        page.draw_rect(fitz.Rect(x, y, x + 40, y + 30), color=(rng.random(), rng.random(), rng.random()))
+    return page
+
+
+def scan_page(doc, rng, size=PAGE_SIZES["letter"]):
+    """A page holding one full-page JPEG of noise, like an unprocessed scan"""
+    width, height = size
+    page = doc.new_page(width=width, height=height)
+    pixels = (int(width * SCAN_SCALE), int(height * SCAN_SCALE))
+    # Seeded noise instead of Image.effect_noise, which is not reproducible
+    grey = Image.frombytes("L", (pixels[0] // 4, pixels[1] // 4), rng.randbytes(pixels[0] * pixels[1] // 16))
+    scan = grey.resize(pixels, Image.Resampling.BILINEAR).convert("RGB")
+    ImageDraw.Draw(scan).text((40, 40), f"Scan {rng.randrange(10000)}", fill="black")
+    buffer = io.BytesIO()
+    scan.save(buffer, "JPEG", quality=80)
+    page.insert_image(page.rect, stream=buffer.getvalue())
+    return page
+
+
+def mixed_page(doc, rng):
+    """A text or scan page of a randomly chosen paper size"""
+    size = PAGE_SIZES[rng.choice(sorted(PAGE_SIZES))]
+    if rng.random() < 0.25:
+        return scan_page(doc, rng, size)
+    return text_page(doc, rng, size)
+
+
+PAGE_KINDS = {
+    "text": text_page,
+    "scan": scan_page,
+    "mixed": mixed_page,
+}
+
+
+def write_pdf(path, pages, kind, seed):
+    """Write one synthetic PDF; the same arguments always give the same pages"""
+    rng = random.Random(seed)
+    with fitz.open() as doc:
+        for _ in range(pages):
+            PAGE_KINDS[kind](doc, rng)
+        doc.set_metadata({"producer": "pdf-wizard benchmark corpus"})
+        doc.save(path, garbage=1, deflate=True, no_new_id=True)
+
+
+def build_corpus(name, scale=1.0, cache_dir=DEFAULT_CACHE_DIR):
+    """Return the file paths of a corpus, generating it on first use"""
+    files, pages, kind, grow = CORPORA[name]
+    if grow == "pages":
+        pages = scaled(pages, scale)
+    else:
+        files = scaled(files, scale)
+    directory = os.path.join(cache_dir, f"v{CORPUS_VERSION}-scale{scale:g}", name)
+    paths = [os.path.join(directory, f"{name}{i:04d}.pdf") for i in range(files)]
+    if all(os.path.exists(path) for path in paths):
+        return paths
+
+    os.makedirs(directory, exist_ok=True)
+    for i, path in enumerate(paths):
+        if not os.path.exists(path):
+            part = path + ".part"
+            write_pdf(part, pages, kind, seed=f"{CORPUS_VERSION}:{name}:{i}")
+            os.replace(part, path)
+    return paths
+
+
+def signature_image(cache_dir=DEFAULT_CACHE_DIR):
+    """A transparent PNG signature for the signing benchmark"""
+    path = os.path.join(cache_dir, f"v{CORPUS_VERSION}-signature.png")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        rng = random.Random(f"{CORPUS_VERSION}:signature")
+        img = Image.new("RGBA", (1200, 400), (255, 255, 255, 0))
+        draw = ImageDraw.Draw(img)
+        points = [(x, 200 + rng.randint(-120, 120)) for x in range(40, 1160, 40)]
+        draw.line(points, fill=(10, 20, 120, 255), width=9, joint="curve")
+        img.save(path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply file and page counts (default: 1.0)")
+    parser.add_argument("--dir", default=DEFAULT_CACHE_DIR, help=f"Cache directory (default: {DEFAULT_CACHE_DIR})")
+    args = parser.parse_args(argv)
+
+    for name in CORPORA:
+        paths = build_corpus(name, args.scale, args.dir)
+        size = sum(os.path.getsize(path) for path in paths)
+        print(f"{name:6} {len(paths):4d} files {size / 1e6:8.1f} MB  {os.path.dirname(paths[0])}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Page-assembly planning and instrumentation.
+
+The page editor produces a flat list of page descriptions. Rather than
+opening a source for every page, the backends ask ``plan_runs`` to group the
+list into runs of consecutive pages from the same source, open each source
+once and copy every run in one call. ``AssemblyStats`` records how many
+times sources were parsed and how long each phase took.
+"""
+import time
+from contextlib import contextmanager
+
+from pdf_trace import span
+
+
+class PageRun:
+    """Consecutive output pages taken from one source.
+
+    For 'pdf' runs, ``start`` and ``end`` are inclusive zero-based page
+    numbers; ``end < start`` means the pages are copied in reverse order.
+    'image' runs always hold a single image page.
+    """
+
+    __slots__ = ("type", "path", "start", "end")
+
+    def __init__(self, type, path, start=0, end=0):
+        self.type = type
+        self.path = path
+        self.start = start
+        self.end = end
+
+    @property
+    def step(self):
+        return 1 if self.end >= self.start else -1
+
+    @property
+    def page_numbers(self):
+        return range(self.start, self.end + self.step, self.step)
+
+    def __len__(self):
+        return abs(self.end - self.start) + 1
+
+    def __repr__(self):
+        if self.type == 'image':
+            return f"PageRun(image {self.path!r})"
+        return f"PageRun({self.path!r} {self.start}..{self.end})"
+
+
+def plan_runs(pages):
+    """Collapse a page list into PageRuns of contiguous pages per source"""
+    runs = []
+    for page_data in pages:
+        if page_data['type'] == 'image':
+            runs.append(PageRun('image', page_data['image_path']))
+            continue
+
+        path = page_data['pdf_path']
+        page_num = page_data['page_num']
+        last = runs[-1] if runs else None
+        if last is not None and last.type == 'pdf' and last.path == path:
+            if len(last) == 1 and abs(page_num - last.end) == 1:
+                last.end = page_num
+                continue
+            if len(last) > 1 and page_num == last.end + last.step:
+                last.end = page_num
+                continue
+        runs.append(PageRun('pdf', path, page_num, page_num))
+    return runs
+
+
+def source_paths(runs):
+    """Distinct PDF sources in first-use order"""
+    return list(dict.fromkeys(run.path for run in runs if run.type == 'pdf'))
+
+
+class AssemblyStats:
+    """Counters and per-phase timings for one assembly"""
+
+    PHASES = ("plan", "open", "copy", "images", "write")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.backend = None
+        self.pages = 0
+        self.runs = 0
+        self.sources = 0
+        self.parses = 0
+        self.phase_times = {phase: 0.0 for phase in self.PHASES}
+
+    @contextmanager
+    def phase(self, name):
+        """Add the time spent in the with-block to phase ``name``"""
+        start = time.perf_counter()
+        try:
+            with span(f"assemble.{name}"):
+                yield
+        finally:
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + time.perf_counter() - start
+
+    @property
+    def total_time(self):
+        return sum(self.phase_times.values())
+
+    def as_dict(self):
+        return {
+            "backend": self.backend,
+            "pages": self.pages,
+            "runs": self.runs,
+            "sources": self.sources,
+            "parses": self.parses,
+            "phase_times": dict(self.phase_times),
+            "total_time": self.total_time,
+        }
+
+    def summary(self):
+        phases = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.phase_times.items())
+        return (f"{self.pages} pages in {self.runs} runs from {self.sources} sources "
+                f"({self.parses} parses, backend {self.backend}): {phases}")
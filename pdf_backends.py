@@ -0,0 +1,235 @@
+"""Interchangeable PDF backends for merge, reverse and page assembly.
+
+Two implementations are provided: the original pure-Python PyPDF2 code and a
+PyMuPDF one built on ``insert_pdf``, which is much faster on large inputs.
+``run`` picks a backend (automatically by input size unless one is named)
+and falls back to the other backend when the first cannot handle a file.
+Backends write straight to the path they are given; callers take care of
+partial outputs.
+"""
+import io
+import os
+
+import fitz  # PyMuPDF
+from PyPDF2 import PdfMerger, PdfReader, PdfWriter
+
+from pdf_assembly import plan_runs, source_paths
+from pdf_images import images_to_pdf_bytes, insert_prepared_image, prepare_images
+from pdf_jobs import JobCancelled, NullContext
+from pdf_trace import span
+
+# Inputs at least this large (in total) go to PyMuPDF when backend is "auto"
+PYMUPDF_MIN_BYTES = 10 * 1024 * 1024
+
+AUTO = "auto"
+
+
+class PyPDF2Backend:
+    """Pure-Python backend; the original implementation of every operation"""
+
+    name = "pypdf2"
+
+    def merge(self, pdf_paths, output_path, ctx):
+        merger = PdfMerger()
+        total_steps = len(pdf_paths) + 1  # One extra step for writing the output
+        try:
+            for i, pdf_path in enumerate(pdf_paths):
+                ctx.check_cancelled()
+                ctx.report(i / total_steps, f"Merging {os.path.basename(pdf_path)}")
+                with span("merge.parse", file=pdf_path):
+                    merger.append(pdf_path)
+
+            ctx.check_cancelled()
+            ctx.report(len(pdf_paths) / total_steps, "Writing merged PDF")
+            with span("merge.write"), open(output_path, "wb") as output_file:
+                merger.write(output_file)
+        finally:
+            merger.close()
+
+    def reverse(self, input_path, output_path, ctx):
+        with span("reverse.parse"):
+            reader = PdfReader(input_path)
+        writer = PdfWriter()
+        total_pages = len(reader.pages)
+
+        for i, page_num in enumerate(range(total_pages - 1, -1, -1)):
+            if i % 50 == 0:
+                ctx.check_cancelled()
+                ctx.report(i / (total_pages + 1), "Reversing pages")
+            writer.add_page(reader.pages[page_num])
+
+        ctx.report(total_pages / (total_pages + 1), "Writing reversed PDF")
+        with span("reverse.write"), open(output_path, "wb") as output_file:
+            writer.write(output_file)
+
+    def assemble(self, pages, output_path, stats, ctx):
+        stats.reset()  # A fallback attempt starts from clean counters
+        stats.backend = self.name
+        with stats.phase("plan"):
+            runs = plan_runs(pages)
+        stats.pages = len(pages)
+        stats.runs = len(runs)
+
+        # Parse every source once up front
+        readers = {}
+        with stats.phase("open"):
+            for pdf_path in source_paths(runs):
+                ctx.check_cancelled()
+                readers[pdf_path] = PdfReader(pdf_path)
+                stats.parses += 1
+        stats.sources = len(readers)
+
+        # Decode all images in parallel into one in-memory PDF, parsed once
+        image_runs = [run for run in runs if run.type == 'image']
+        image_pages = []
+        if image_runs:
+            with stats.phase("images"):
+                prepared = prepare_images([run.path for run in image_runs])
+                image_pdf = images_to_pdf_bytes([prepared[run.path] for run in image_runs])
+                image_pages = PdfReader(io.BytesIO(image_pdf)).pages
+                stats.parses += 1
+
+        writer = PdfWriter()
+        image_index = 0
+        total_steps = len(runs) + 1
+        for i, run in enumerate(runs):
+            ctx.check_cancelled()
+            ctx.report(i / total_steps, f"Adding pages ({i + 1} of {len(runs)} runs)")
+
+            if run.type == 'pdf':
+                with stats.phase("copy"):
+                    reader_pages = readers[run.path].pages
+                    for page_num in run.page_numbers:
+                        writer.add_page(reader_pages[page_num])
+            elif run.type == 'image':
+                with stats.phase("images"):
+                    writer.add_page(image_pages[image_index])
+                image_index += 1
+
+        ctx.check_cancelled()
+        ctx.report(len(runs) / total_steps, "Writing PDF")
+        with stats.phase("write"):
+            with open(output_path, 'wb') as output_file:
+                writer.write(output_file)
+
+
+class PyMuPDFBackend:
+    """MuPDF-based backend; copies pages natively with insert_pdf"""
+
+    name = "pymupdf"
+
+    def merge(self, pdf_paths, output_path, ctx):
+        total_steps = len(pdf_paths) + 1
+        with fitz.open() as output_doc:
+            for i, pdf_path in enumerate(pdf_paths):
+                ctx.check_cancelled()
+                ctx.report(i / total_steps, f"Merging {os.path.basename(pdf_path)}")
+                with span("merge.copy", file=pdf_path), fitz.open(pdf_path) as src:
+                    output_doc.insert_pdf(src)
+
+            ctx.check_cancelled()
+            ctx.report(len(pdf_paths) / total_steps, "Writing merged PDF")
+            with span("merge.write"):
+                output_doc.save(output_path)
+
+    def reverse(self, input_path, output_path, ctx):
+        with fitz.open(input_path) as doc:
+            ctx.report(0.0, "Reversing pages")
+            doc.select(list(range(len(doc) - 1, -1, -1)))
+            ctx.check_cancelled()
+            ctx.report(0.5, "Writing reversed PDF")
+            with span("reverse.write"):
+                doc.save(output_path, garbage=1)
+
+    def assemble(self, pages, output_path, stats, ctx):
+        stats.reset()  # A fallback attempt starts from clean counters
+        stats.backend = self.name
+        with stats.phase("plan"):
+            runs = plan_runs(pages)
+        stats.pages = len(pages)
+        stats.runs = len(runs)
+
+        sources = {}
+        total_steps = len(runs) + 1
+        try:
+            # Parse every source once up front
+            with stats.phase("open"):
+                for pdf_path in source_paths(runs):
+                    ctx.check_cancelled()
+                    sources[pdf_path] = fitz.open(pdf_path)
+                    stats.parses += 1
+            stats.sources = len(sources)
+
+            # Decode all images in parallel before copying
+            with stats.phase("images"):
+                prepared = prepare_images([run.path for run in runs if run.type == 'image'])
+
+            with fitz.open() as output_doc:
+                for i, run in enumerate(runs):
+                    ctx.check_cancelled()
+                    ctx.report(i / total_steps, f"Adding pages ({i + 1} of {len(runs)} runs)")
+
+                    if run.type == 'pdf':
+                        # insert_pdf copies a whole run, backwards when end < start
+                        with stats.phase("copy"):
+                            output_doc.insert_pdf(sources[run.path], from_page=run.start, to_page=run.end)
+                    elif run.type == 'image':
+                        with stats.phase("images"):
+                            insert_prepared_image(output_doc, prepared[run.path])
+
+                ctx.check_cancelled()
+                ctx.report(len(runs) / total_steps, "Writing PDF")
+                with stats.phase("write"):
+                    output_doc.save(output_path)
+        finally:
+            for src in sources.values():
+                src.close()
+
+
+BACKENDS = {
+    PyPDF2Backend.name: PyPDF2Backend(),
+    PyMuPDFBackend.name: PyMuPDFBackend(),
+}
+
+
+def choose_backend(input_paths, backend=AUTO):
+    """Return the backend name to use for the given PDF inputs"""
+    if backend != AUTO:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}; choose from {', '.join(BACKENDS)} or {AUTO}")
+        return backend
+    total_size = 0
+    for path in input_paths:
+        try:
+            total_size += os.path.getsize(path)
+        except OSError:
+            pass
+    return PyMuPDFBackend.name if total_size >= PYMUPDF_MIN_BYTES else PyPDF2Backend.name
+
+
+def run(operation, input_paths, backend, *args, ctx=None):
+    """Run ``operation`` ('merge', 'reverse' or 'assemble') on a backend.
+
+    ``input_paths`` is only used to choose the backend; ``args`` are passed
+    to the backend method. If the chosen backend raises, the other backend is
+    tried before the original error is re-raised. Returns the name of the
+    backend that produced the output.
+    """
+    ctx = ctx or NullContext()
+    primary = choose_backend(input_paths, backend)
+    order = [primary] + [name for name in BACKENDS if name != primary]
+
+    first_error = None
+    for name in order:
+        try:
+            with span(f"backend.{operation}", backend=name):
+                getattr(BACKENDS[name], operation)(*args, ctx=ctx)
+            return name
+        except JobCancelled:
+            raise
+        except Exception as e:
+            if first_error is not None:
+                raise first_error
+            first_error = e
+            ctx.report(0.0, f"{name} failed ({e}); retrying with another backend")
+    raise first_error
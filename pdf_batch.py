@@ -0,0 +1,362 @@
+"""Run many merge, reverse, reorder and sign jobs from a manifest.
+
+A manifest is a JSON (or, with PyYAML installed, YAML) file listing jobs::
+
+    {
+      "workers": 4,
+      "memory_limit": "1G",
+      "jobs": [
+        {"id": "book", "type": "merge", "inputs": ["ch1.pdf", "ch2.pdf"], "output": "book.pdf",
+         "optimize": "standard"},
+        {"id": "back", "type": "reverse", "input": "book.pdf", "output": "book_reversed.pdf"},
+        {"id": "pick", "type": "reorder", "pages": ["book.pdf:5,1-4", "cover.jpg"], "output": "pick.pdf"},
+        {"id": "sign", "type": "sign", "input": "pick.pdf", "image": "sig.png",
+         "at": ["1:400,700,550,760"], "output": "signed.pdf", "after": ["back"]}
+      ]
+    }
+
+Relative paths are resolved against the manifest's directory. A job waits
+for the jobs named in its ``after`` list and for any job whose output it
+reads. Independent jobs run concurrently in worker processes, as many at a
+time as ``workers`` allows and as long as their estimated memory (input size
+times MEMORY_EXPANSION_FACTOR) fits under ``memory_limit``. A job whose
+dependency failed is skipped. Every job gets a line in the timing report.
+Merge, reorder and assemble jobs take an optional ``optimize`` level (see
+pdf_optimize), and merge, reverse, reorder and assemble jobs take
+``"linearize": true`` for fast-web-view output.
+
+Command line usage::
+
+    python -m pdf_batch jobs.json -j 4 --memory-limit 2G --report report.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import fitz  # PyMuPDF
+
+try:
+    import yaml
+except ImportError:  # YAML manifests are optional
+    yaml = None
+
+import pdf_core
+from pdf_backends import AUTO
+from pdf_core import MEMORY_EXPANSION_FACTOR, ConsoleContext, parse_size
+from pdf_jobs import JobCancelled, NullContext, remove_partial
+from pdf_optimize import DEFAULT_OPTIMIZE_LEVEL, OPTIMIZE_LEVELS
+
+# Concurrent jobs may together be estimated to use this much memory
+DEFAULT_BATCH_MEMORY = 1024 ** 3
+
+# Required keys per job type; "reorder" is the page editor's save (assemble_pages)
+JOB_FIELDS = {
+    "merge": ("inputs", "output"),
+    "reverse": ("input", "output"),
+    "reorder": ("pages", "output"),
+    "assemble": ("pages", "output"),
+    "sign": ("input", "image", "at", "output"),
+}
+
+
+class ManifestError(ValueError):
+    """The manifest is malformed, refers to unknown jobs or has a cycle"""
+
+
+def load_config_file(path):
+    """Parse a JSON, or with PyYAML a YAML, file"""
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ManifestError("YAML files need PyYAML (pip install pyyaml)")
+            try:
+                return yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ManifestError(f"{path}: {e}") from e
+        return json.load(f)
+
+
+def load_manifest(path):
+    """Read a manifest file and resolve its jobs (see plan_jobs)"""
+    manifest = load_config_file(path)
+    if isinstance(manifest, list):
+        manifest = {"jobs": manifest}
+    if manifest is None:
+        raise ManifestError(f"{path} is empty")
+    if not isinstance(manifest, dict):
+        raise ManifestError(f"{path}: expected a mapping or a list of jobs, got {type(manifest).__name__}")
+    base_dir = os.path.dirname(os.path.abspath(path))
+    manifest["jobs"] = plan_jobs(manifest.get("jobs") or [], base_dir)
+    if manifest.get("report"):
+        manifest["report"] = os.path.join(base_dir, manifest["report"])
+    return manifest
+
+
+def split_spec(spec):
+    """Split a page spec like ``file.pdf:1-3`` into its path and ``:1-3``"""
+    if ":" not in os.path.basename(spec):
+        return spec, ""
+    path, _, ranges = spec.rpartition(":")
+    return path, ":" + ranges
+
+
+def job_inputs(job):
+    """Files a job reads"""
+    if job["type"] == "merge":
+        return list(job["inputs"])
+    if job["type"] in ("reorder", "assemble"):
+        return list(dict.fromkeys(split_spec(spec)[0] for spec in job["pages"]))
+    if job["type"] == "sign":
+        return [job["input"], job["image"]]
+    return [job["input"]]
+
+
+def plan_jobs(jobs, base_dir="."):
+    """Validate jobs, resolve their paths and return them in dependency order.
+
+    Each returned job has an ``id`` and a ``deps`` list: the ids named in
+    ``after`` plus the jobs producing one of its inputs.
+    """
+    planned = {}
+    if not isinstance(jobs, list):
+        raise ManifestError(f"jobs must be a list, got {type(jobs).__name__}")
+    for number, job in enumerate(jobs, 1):
+        if not isinstance(job, dict):
+            raise ManifestError(f"Job {number} must be a mapping of fields, got {job!r}")
+        job = dict(job)
+        job.setdefault("id", f"job{number}")
+        if job["id"] in planned:
+            raise ManifestError(f"Duplicate job id {job['id']!r}")
+        if job.get("type") not in JOB_FIELDS:
+            raise ManifestError(f"Job {job['id']!r}: type must be one of {', '.join(JOB_FIELDS)}")
+        missing = [key for key in JOB_FIELDS[job["type"]] if key not in job]
+        if missing:
+            raise ManifestError(f"Job {job['id']!r} ({job['type']}) is missing {', '.join(missing)}")
+        if job.get("optimize", DEFAULT_OPTIMIZE_LEVEL) not in OPTIMIZE_LEVELS:
+            raise ManifestError(f"Job {job['id']!r}: optimize must be one of {', '.join(OPTIMIZE_LEVELS)}")
+
+        for key in ("input", "image", "output"):
+            if key in job:
+                job[key] = os.path.join(base_dir, job[key])
+        if "inputs" in job:
+            job["inputs"] = [os.path.join(base_dir, path) for path in job["inputs"]]
+        if "pages" in job:
+            job["pages"] = [os.path.join(base_dir, path) + ranges
+                            for path, ranges in map(split_spec, job["pages"])]
+        if job["type"] == "sign" and isinstance(job["at"], str):
+            job["at"] = [job["at"]]
+        planned[job["id"]] = job
+
+    producers = {os.path.normpath(job["output"]): job["id"] for job in planned.values()}
+    for job in planned.values():
+        after = job.get("after") or []
+        unknown = [dep for dep in after if dep not in planned]
+        if unknown:
+            raise ManifestError(f"Job {job['id']!r} runs after unknown job(s) {', '.join(unknown)}")
+        implicit = [producers.get(os.path.normpath(path)) for path in job_inputs(job)]
+        job["deps"] = list(dict.fromkeys(dep for dep in after + implicit if dep and dep != job["id"]))
+
+    ordered = []
+    state = {}
+
+    def visit(job_id, chain):
+        if state.get(job_id) == "done":
+            return
+        if state.get(job_id) == "visiting":
+            raise ManifestError(f"Dependency cycle: {' -> '.join(chain + [job_id])}")
+        state[job_id] = "visiting"
+        for dep in planned[job_id]["deps"]:
+            visit(dep, chain + [job_id])
+        state[job_id] = "done"
+        ordered.append(planned[job_id])
+
+    for job_id in planned:
+        visit(job_id, [])
+    return ordered
+
+
+def estimate_memory(job):
+    """Rough peak memory of a job: its inputs' size times MEMORY_EXPANSION_FACTOR"""
+    total = 0
+    for path in job_inputs(job):
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total * MEMORY_EXPANSION_FACTOR
+
+
+def run_job(job):
+    """Execute one job in a worker process and return its timing record"""
+    record = {"id": job["id"], "type": job["type"], "output": job["output"], "status": "done",
+              "error": None, "pid": os.getpid(), "pages": 0, "output_bytes": 0}
+    start = time.perf_counter()
+    backend = job.get("backend", AUTO)
+    optimize = job.get("optimize", DEFAULT_OPTIMIZE_LEVEL)
+    linearize = bool(job.get("linearize", False))
+    try:
+        os.makedirs(os.path.dirname(job["output"]), exist_ok=True)
+        if job["type"] == "merge":
+            pdf_core.merge_pdfs(job["inputs"], job["output"], streaming=job.get("streaming"), backend=backend,
+                                optimize=optimize, linearize=linearize)
+        elif job["type"] == "reverse":
+            pdf_core.reverse_pdf(job["input"], job["output"], backend=backend,
+                                 incremental=job.get("incremental", True), linearize=linearize)
+        elif job["type"] in ("reorder", "assemble"):
+            pages = []
+            for spec in job["pages"]:
+                pages.extend(pdf_core.parse_page_spec(spec))
+            pdf_core.assemble_pages(pages, job["output"], backend=backend, optimize=optimize,
+                                    linearize=linearize)
+        elif job["type"] == "sign":
+            signatures = dict(pdf_core.parse_signature_spec(spec) for spec in job["at"])
+            pdf_core.sign_pdf(job["input"], job["image"], signatures, job["output"],
+                              incremental=job.get("incremental", True))
+        with fitz.open(job["output"]) as doc:
+            record["pages"] = len(doc)
+        record["output_bytes"] = os.path.getsize(job["output"])
+    except Exception as e:
+        remove_partial(job["output"])
+        record["status"] = "failed"
+        record["error"] = str(e)
+    record["seconds"] = time.perf_counter() - start
+    return record
+
+
+def run_manifest(jobs, workers=None, memory_limit=DEFAULT_BATCH_MEMORY, ctx=None):
+    """Run planned jobs (see plan_jobs) on a process pool.
+
+    Returns one record per job, in plan order, with its status ("done",
+    "failed", "skipped" or "cancelled"), error, seconds spent running,
+    seconds spent waiting to start, estimated memory, output page count
+    and size.
+    """
+    ctx = ctx or NullContext()
+    workers = max(1, workers or os.cpu_count() or 1)
+    records = {}
+    waiting = list(jobs)
+    running = {}  # future -> (job, estimated memory, submit time)
+    start = time.perf_counter()
+
+    def finish(record):
+        records[record["id"]] = record
+        ctx.report(len(records) / max(1, len(jobs)),
+                   f"{record['id']}: {record['status']}" + (f" ({record['error']})" if record["error"] else ""))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            while waiting or running:
+                ctx.check_cancelled()
+                in_use = sum(memory for _, memory, _ in running.values())
+                for job in list(waiting):
+                    if any(records.get(dep, {}).get("status") in ("failed", "skipped") for dep in job["deps"]):
+                        waiting.remove(job)
+                        finish(skipped_record(job, "skipped", "a dependency failed"))
+                        continue
+                    if len(running) >= workers or not all(dep in records for dep in job["deps"]):
+                        continue
+                    memory = estimate_memory(job)
+                    # A job bigger than the whole budget still runs, but on its own
+                    if running and in_use + memory > memory_limit:
+                        continue
+                    waiting.remove(job)
+                    running[pool.submit(run_job, job)] = (job, memory, time.perf_counter())
+                    in_use += memory
+
+                if not running:
+                    continue
+                done, _ = wait(running, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job, memory, submitted = running.pop(future)
+                    record = future.result()
+                    record["queued"] = submitted - start
+                    record["estimated_memory"] = memory
+                    finish(record)
+        except JobCancelled:
+            # Jobs already in a worker finish (and clean up) on their own
+            for future, (job, _, _) in running.items():
+                future.cancel()
+                records[job["id"]] = skipped_record(job, "cancelled")
+            for job in waiting:
+                records[job["id"]] = skipped_record(job, "cancelled")
+            raise
+    return [records[job["id"]] for job in jobs]
+
+
+def skipped_record(job, status, error=None):
+    """Timing record for a job that never ran"""
+    return {"id": job["id"], "type": job["type"], "output": job["output"], "status": status,
+            "error": error, "pid": None, "pages": 0, "output_bytes": 0, "seconds": 0.0}
+
+
+def format_report(records, elapsed):
+    """Human-readable timing table"""
+    lines = [f"{'job':20} {'type':8} {'status':9} {'wait':>7} {'run':>7} {'pages':>6} {'size':>9}"]
+    for record in records:
+        lines.append(f"{record['id'][:20]:20} {record['type']:8} {record['status']:9} "
+                     f"{record.get('queued', 0.0):6.2f}s {record['seconds']:6.2f}s "
+                     f"{record['pages']:6d} {record['output_bytes'] / 1e6:7.1f}MB")
+        if record["error"]:
+            lines.append(f"    {record['error']}")
+    busy = sum(record["seconds"] for record in records)
+    done = sum(1 for record in records if record["status"] == "done")
+    lines.append(f"{done} of {len(records)} jobs done in {elapsed:.2f}s "
+                 f"({busy:.2f}s of work, {busy / max(elapsed, 1e-9):.1f}x parallel)")
+    return "\n".join(lines)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m pdf_batch",
+                                     description="Run the PDF jobs described in a JSON or YAML manifest.")
+    parser.add_argument("manifest", help="manifest file (.json, .yaml or .yml)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: manifest 'workers', else one per CPU)")
+    parser.add_argument("--memory-limit", type=parse_size, default=None, metavar="SIZE",
+                        help="estimated memory of concurrent jobs, e.g. 2G (default: manifest, else 1G)")
+    parser.add_argument("--report", help="write the timing report as JSON to this file")
+    parser.add_argument("--dry-run", action="store_true", help="print the job order and exit")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not print progress")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        manifest = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    jobs = manifest["jobs"]
+
+    if args.dry_run:
+        for job in jobs:
+            deps = f" (after {', '.join(job['deps'])})" if job["deps"] else ""
+            print(f"{job['id']}: {job['type']} -> {job['output']}{deps}")
+        return 0
+
+    workers = args.jobs or manifest.get("workers")
+    memory_limit = args.memory_limit or manifest.get("memory_limit") or DEFAULT_BATCH_MEMORY
+    if isinstance(memory_limit, str):
+        memory_limit = parse_size(memory_limit)
+
+    start = time.perf_counter()
+    try:
+        records = run_manifest(jobs, workers, memory_limit, ctx=ConsoleContext(quiet=args.quiet))
+    except (JobCancelled, KeyboardInterrupt):
+        return 1
+    elapsed = time.perf_counter() - start
+
+    print(format_report(records, elapsed))
+    report_path = args.report or manifest.get("report")
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump({"elapsed": elapsed, "workers": workers, "memory_limit": memory_limit,
+                       "jobs": records}, f, indent=2)
+    return 0 if all(record["status"] == "done" for record in records) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
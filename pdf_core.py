@@ -0,0 +1,548 @@
+"""GUI-free PDF engine: merge, reverse, page assembly and signing.
+
+This module never imports tkinter so it can be used from batch scripts and on
+headless machines. Every operation accepts an optional ``ctx`` (see
+``pdf_jobs.JobContext``) for progress reporting and cancellation.
+
+Command line usage::
+
+    python -m pdf_core merge -o merged.pdf a.pdf b.pdf
+    python -m pdf_core merge --optimize standard -o merged.pdf invoices/*.pdf
+    python -m pdf_core reverse scan.pdf -o reversed.pdf
+    python -m pdf_core reverse scan.pdf --linearize -o web.pdf
+    python -m pdf_core assemble -o out.pdf a.pdf:1-3 cover.jpg b.pdf:5,2
+    python -m pdf_core sign contract.pdf --image sig.png --at 1:400,700,550,760 -o signed.pdf
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import fitz  # PyMuPDF
+
+import pdf_backends
+from pdf_assembly import AssemblyStats
+from pdf_backends import AUTO, BACKENDS
+from pdf_incremental import can_append, save_incremental
+from pdf_jobs import JobCancelled, NullContext, commit_output, partial_path, remove_partial
+from pdf_optimize import DEFAULT_OPTIMIZE_LEVEL, OPTIMIZE_LEVELS, optimize_pdf, savings_line
+from pdf_trace import configure as configure_tracing, span, traced
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tiff", ".tif")
+
+# Default memory ceiling for streaming merges
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
+
+# Parsed PDF objects take several times their on-disk size in memory
+MEMORY_EXPANSION_FACTOR = 3
+
+# Merges of more files than this use the streaming mode automatically
+STREAMING_MIN_FILES = 200
+
+# Appended to file names by batch reverse when writing next to the inputs
+DEFAULT_REVERSE_SUFFIX = "_reversed"
+
+
+def should_stream(pdf_paths, memory_limit=DEFAULT_MEMORY_LIMIT):
+    """Return True when a merge is large enough to need the streaming mode"""
+    if len(pdf_paths) >= STREAMING_MIN_FILES:
+        return True
+    total_size = sum(os.path.getsize(path) for path in pdf_paths)
+    return total_size * MEMORY_EXPANSION_FACTOR > memory_limit
+
+
+def plan_batches(pdf_paths, memory_limit=DEFAULT_MEMORY_LIMIT):
+    """Split inputs into consecutive batches that fit under memory_limit.
+
+    The estimate is the on-disk size times MEMORY_EXPANSION_FACTOR. A file
+    larger than the limit on its own still gets a batch of its own.
+    """
+    budget = max(1, memory_limit // MEMORY_EXPANSION_FACTOR)
+    batches = []
+    batch = []
+    batch_size = 0
+    for path in pdf_paths:
+        size = os.path.getsize(path)
+        if batch and batch_size + size > budget:
+            batches.append(batch)
+            batch = []
+            batch_size = 0
+        batch.append(path)
+        batch_size += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+@traced("merge_pdfs_streaming")
+def merge_pdfs_streaming(pdf_paths, output_path, memory_limit=DEFAULT_MEMORY_LIMIT, ctx=None,
+                         optimize=DEFAULT_OPTIMIZE_LEVEL, linearize=False):
+    """Merge PDFs with roughly constant peak memory, whatever the input count.
+
+    Inputs are appended in batches sized by plan_batches. Each input is closed
+    as soon as its pages are copied, and after every batch the output is
+    saved incrementally and reopened, so only the current batch's objects are
+    held in memory while earlier pages already sit on disk.
+    """
+    ctx = ctx or NullContext()
+    batches = plan_batches(pdf_paths, memory_limit)
+    part_path = partial_path(output_path)
+    total_files = len(pdf_paths)
+    done_files = 0
+
+    for batch_num, batch in enumerate(batches):
+        output_doc = fitz.open(part_path) if batch_num else fitz.open()
+        try:
+            for pdf_path in batch:
+                ctx.check_cancelled()
+                ctx.report(done_files / (total_files + 1), f"Merging {os.path.basename(pdf_path)}")
+                with span("merge.copy", file=pdf_path), fitz.open(pdf_path) as src:
+                    output_doc.insert_pdf(src)
+                done_files += 1
+
+            ctx.check_cancelled()
+            with span("merge.write", batch=batch_num):
+                if batch_num:
+                    output_doc.saveIncr()
+                else:
+                    output_doc.save(part_path)
+        finally:
+            output_doc.close()
+        # Empty MuPDF's resource cache so it does not grow across batches
+        fitz.TOOLS.store_shrink(100)
+
+    finish_output(part_path, optimize, linearize, ctx)
+    ctx.check_cancelled()
+    commit_output(output_path)
+    return output_path
+
+
+def finish_output(part_path, level, linearize, ctx):
+    """Optimize and/or linearize a partial output and report the bytes saved"""
+    if level in (None, "none") and not linearize:
+        return None
+    result = optimize_pdf(part_path, level=level or "none", ctx=ctx, linearize=linearize)
+    ctx.report(1.0, savings_line(result))
+    return result
+
+
+@traced("merge_pdfs")
+def merge_pdfs(pdf_paths, output_path, ctx=None, streaming=False, memory_limit=DEFAULT_MEMORY_LIMIT,
+               backend=AUTO, optimize=DEFAULT_OPTIMIZE_LEVEL, linearize=False):
+    """Merge PDFs in order into output_path, reporting progress per file.
+
+    With ``streaming=True`` the bounded-memory merge_pdfs_streaming is used;
+    ``streaming=None`` picks it automatically via should_stream. Otherwise
+    the merge runs on ``backend`` (see pdf_backends). ``optimize`` names a
+    level from pdf_optimize.OPTIMIZE_LEVELS applied before the output is
+    committed; the bytes saved are reported through ctx. ``linearize``
+    writes a validated linearized ("fast web view") file.
+    """
+    if streaming is None:
+        streaming = should_stream(pdf_paths, memory_limit)
+    if streaming:
+        return merge_pdfs_streaming(pdf_paths, output_path, memory_limit=memory_limit, ctx=ctx,
+                                    optimize=optimize, linearize=linearize)
+
+    ctx = ctx or NullContext()
+    pdf_backends.run("merge", pdf_paths, backend, pdf_paths, partial_path(output_path), ctx=ctx)
+    finish_output(partial_path(output_path), optimize, linearize, ctx)
+
+    ctx.check_cancelled()
+    commit_output(output_path)
+    return output_path
+
+
+@traced("reverse_pdf")
+def reverse_pdf(input_path, output_path, ctx=None, backend=AUTO, incremental=True, linearize=False):
+    """Write a copy of input_path with its pages in reverse order.
+
+    With ``incremental`` (and no explicit backend) the input is copied and
+    only a new page tree is appended as an incremental update; pages,
+    fonts and images are not re-serialized. Files that cannot be updated
+    that way are rewritten by a backend. ``linearize`` rewrites the result
+    as a linearized file, as in merge_pdfs.
+    """
+    ctx = ctx or NullContext()
+    part_path = partial_path(output_path)
+    if not (incremental and backend == AUTO and reverse_incremental(input_path, part_path, ctx)):
+        pdf_backends.run("reverse", [input_path], backend, input_path, part_path, ctx=ctx)
+    finish_output(part_path, None, linearize, ctx)
+
+    ctx.check_cancelled()
+    commit_output(output_path)
+    return output_path
+
+
+def reverse_incremental(input_path, output_path, ctx):
+    """Reverse by appending a reordered page tree to a copy of input_path.
+
+    Returns False, leaving nothing behind, when the file cannot be updated
+    incrementally.
+    """
+    ctx.report(0.0, "Copying original PDF")
+    shutil.copyfile(input_path, output_path)
+    doc = fitz.open(output_path)
+    appendable = False
+    try:
+        appendable = can_append(doc)
+        if appendable:
+            ctx.check_cancelled()
+            ctx.report(0.5, "Reversing pages")
+            with span("reverse.select"):
+                doc.select(list(range(len(doc) - 1, -1, -1)))
+            with span("reverse.write", incremental=True):
+                save_incremental(doc)
+    finally:
+        doc.close()
+    if not appendable:
+        os.remove(output_path)
+    return appendable
+
+
+def collect_pdfs(paths, skip_suffix=None):
+    """Expand directories into the PDFs they contain (sorted, not recursive).
+
+    Files in a directory whose name ends with ``skip_suffix`` + ".pdf" are
+    left out, so earlier outputs are not picked up as new inputs.
+    """
+    pdf_paths = []
+    for path in paths:
+        if not os.path.isdir(path):
+            pdf_paths.append(path)
+            continue
+        for name in sorted(os.listdir(path)):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() != ".pdf" or (skip_suffix and stem.endswith(skip_suffix)):
+                continue
+            pdf_paths.append(os.path.join(path, name))
+    return pdf_paths
+
+
+def batch_output_path(input_path, output_dir=None, suffix=DEFAULT_REVERSE_SUFFIX):
+    """Where reverse_batch writes the result for input_path"""
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir or os.path.dirname(input_path), f"{stem}{suffix}.pdf")
+
+
+def reverse_one(input_path, output_path, backend=AUTO):
+    """Reverse one file for reverse_batch and measure it (runs in a worker process)"""
+    result = {"input": input_path, "output": output_path, "pages": 0,
+              "bytes": os.path.getsize(input_path), "seconds": 0.0, "error": None}
+    start = time.perf_counter()
+    try:
+        reverse_pdf(input_path, output_path, backend=backend)
+        with fitz.open(output_path) as doc:
+            result["pages"] = len(doc)
+    except Exception as e:
+        remove_partial(output_path)
+        result["error"] = str(e)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def reverse_batch(input_paths, output_dir=None, suffix=DEFAULT_REVERSE_SUFFIX, workers=None,
+                  ctx=None, backend=AUTO):
+    """Reverse many PDFs in parallel worker processes.
+
+    ``input_paths`` may contain directories (see collect_pdfs). Outputs go to
+    ``output_dir`` or next to each input, named with ``suffix``. Returns one
+    result dict per file, in input order, with the page count, input size,
+    elapsed seconds and error (None on success); a failed file does not
+    stop the others.
+    """
+    ctx = ctx or NullContext()
+    pdf_paths = collect_pdfs(input_paths, skip_suffix=suffix)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pdf_paths) or 1))
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(reverse_one, path, batch_output_path(path, output_dir, suffix), backend): path
+            for path in pdf_paths
+        }
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                results[futures[future]] = result
+                ctx.report(done / len(pdf_paths), f"Reversed {done} of {len(pdf_paths)}: "
+                                                  f"{os.path.basename(result['input'])}")
+                ctx.check_cancelled()
+        except JobCancelled:
+            for future in futures:
+                future.cancel()
+            raise
+    return [results[path] for path in pdf_paths]
+
+
+def throughput_line(result):
+    """One-line summary of a reverse_batch result"""
+    name = os.path.basename(result["input"])
+    if result["error"]:
+        return f"{name}: FAILED ({result['error']})"
+    seconds = max(result["seconds"], 1e-9)
+    return (f"{name}: {result['pages']} pages, {result['bytes'] / 1e6:.1f} MB in {seconds:.2f}s "
+            f"({result['pages'] / seconds:.0f} pages/s, {result['bytes'] / 1e6 / seconds:.1f} MB/s)")
+
+
+@traced("assemble_pages")
+def assemble_pages(pages, output_path, ctx=None, backend=AUTO, stats=None, optimize=DEFAULT_OPTIMIZE_LEVEL,
+                   linearize=False):
+    """Build a PDF from a list of page descriptions.
+
+    Each entry is a dict with 'type' set to 'pdf' (plus 'pdf_path' and a
+    zero-based 'page_num') or 'image' (plus 'image_path'). This is the page
+    list used by the page editor. Each source is parsed once and contiguous
+    pages are copied as runs; pass an AssemblyStats as ``stats`` to collect
+    parse counts and per-phase timings. ``optimize`` and ``linearize`` are
+    applied as in merge_pdfs.
+    """
+    ctx = ctx or NullContext()
+    stats = stats if stats is not None else AssemblyStats()
+    sources = list(dict.fromkeys(p['pdf_path'] for p in pages if p['type'] == 'pdf'))
+
+    pdf_backends.run("assemble", sources, backend, pages, partial_path(output_path), stats, ctx=ctx)
+    ctx.report(1.0, stats.summary())
+    finish_output(partial_path(output_path), optimize, linearize, ctx)
+
+    ctx.check_cancelled()
+    commit_output(output_path)
+    return output_path
+
+
+@traced("sign_pdf")
+def sign_pdf(pdf_path, image_path, signatures, output_path, ctx=None, incremental=True):
+    """Stamp the signature image onto pages of pdf_path.
+
+    ``signatures`` maps zero-based page numbers to (x1, y1, x2, y2) rectangles
+    in PDF points measured from the top-left corner of the page. The image
+    is embedded once and shared by every signed page.
+
+    By default the original file is copied unchanged and the new objects are
+    appended as an incremental update, so the work scales with the number of
+    signed pages rather than the file size and existing digital signatures
+    stay valid. Files that cannot be updated incrementally (e.g. ones MuPDF
+    had to repair) are rewritten in full, as with ``incremental=False``.
+    """
+    ctx = ctx or NullContext()
+    with open(image_path, "rb") as f:
+        image_data = f.read()
+
+    part_path = partial_path(output_path)
+    output_doc = None
+    if incremental:
+        ctx.report(0.0, "Copying original PDF")
+        shutil.copyfile(pdf_path, part_path)
+        output_doc = fitz.open(part_path)
+        if not can_append(output_doc):
+            output_doc.close()
+            incremental = False
+    if not incremental:
+        output_doc = fitz.open(pdf_path)
+
+    try:
+        total_steps = len(signatures) + 1
+        image_xref = 0
+        for i, (page_num, rect) in enumerate(sorted(signatures.items())):
+            ctx.check_cancelled()
+            ctx.report(i / total_steps, f"Signing page {page_num + 1}")
+            page = output_doc[page_num]
+            # Embed the image on the first page only; later pages reference the same object
+            if image_xref:
+                page.insert_image(fitz.Rect(rect), xref=image_xref)
+            else:
+                image_xref = page.insert_image(fitz.Rect(rect), stream=image_data)
+
+        ctx.check_cancelled()
+        ctx.report(len(signatures) / total_steps, "Writing signed PDF")
+        with span("sign.write", incremental=incremental):
+            if incremental:
+                save_incremental(output_doc)
+            else:
+                output_doc.save(part_path)
+    finally:
+        output_doc.close()
+
+    ctx.check_cancelled()
+    commit_output(output_path)
+    return output_path
+
+
+def parse_page_spec(spec):
+    """Turn a CLI page spec into assemble_pages entries.
+
+    ``file.pdf`` adds every page, ``file.pdf:1-3,7`` adds the listed pages
+    (one-based, ranges may run backwards like ``5-1``) and an image path adds
+    the image as a page.
+    """
+    if spec.lower().endswith(IMAGE_EXTENSIONS):
+        return [{'type': 'image', 'image_path': spec}]
+
+    path, _, ranges = spec.rpartition(":") if ":" in os.path.basename(spec) else (spec, "", "")
+    if not ranges:
+        with fitz.open(path) as doc:
+            page_count = len(doc)
+        return [{'type': 'pdf', 'pdf_path': path, 'page_num': n} for n in range(page_count)]
+
+    pages = []
+    for part in ranges.split(","):
+        if "-" in part:
+            start, end = (int(n) for n in part.split("-", 1))
+            step = 1 if end >= start else -1
+            numbers = range(start, end + step, step)
+        else:
+            numbers = [int(part)]
+        pages.extend({'type': 'pdf', 'pdf_path': path, 'page_num': n - 1} for n in numbers)
+    return pages
+
+
+def parse_signature_spec(spec):
+    """Parse ``PAGE:X1,Y1,X2,Y2`` (one-based page) into (page_num, rect)"""
+    page, _, coords = spec.partition(":")
+    rect = tuple(float(v) for v in coords.split(","))
+    if len(rect) != 4:
+        raise ValueError(f"Expected PAGE:X1,Y1,X2,Y2, got {spec!r}")
+    return int(page) - 1, rect
+
+
+def parse_size(text):
+    """Parse a byte count such as ``1048576``, ``512K``, ``256M`` or ``2G``"""
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+class ConsoleContext(NullContext):
+    """Progress reporting for the command line"""
+
+    def __init__(self, quiet=False):
+        self.quiet = quiet
+
+    def report(self, fraction, message=None):
+        if not self.quiet:
+            print(f"[{int(fraction * 100):3d}%] {message or ''}", file=sys.stderr)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m pdf_core",
+                                     description="Merge, reverse, assemble and sign PDFs without the GUI.")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not print progress")
+    parser.add_argument("--trace", metavar="FILE", help="append timing spans to FILE as JSON lines")
+    parser.add_argument("--profile", metavar="MODE",
+                        help="profile each operation: cprofile, tracemalloc or both (comma-separated)")
+    parser.add_argument("--backend", choices=[AUTO] + list(BACKENDS), default=AUTO,
+                        help="PDF library for merge, reverse and assemble (default: by input size)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    merge = commands.add_parser("merge", help="merge PDFs in the given order")
+    merge.add_argument("inputs", nargs="+", help="PDF files to merge")
+    merge.add_argument("-o", "--output", required=True, help="output PDF")
+    merge.add_argument("--stream", dest="streaming", action="store_const", const=True, default=None,
+                       help="always use the bounded-memory streaming merge")
+    merge.add_argument("--no-stream", dest="streaming", action="store_const", const=False,
+                       help="never use the streaming merge")
+    merge.add_argument("--memory-limit", type=parse_size, default=DEFAULT_MEMORY_LIMIT, metavar="SIZE",
+                       help="memory ceiling for streaming, e.g. 512M or 2G (default: 256M)")
+    merge.add_argument("--optimize", choices=list(OPTIMIZE_LEVELS), default=DEFAULT_OPTIMIZE_LEVEL,
+                       help="deduplicate and compress the output (default: none)")
+    merge.add_argument("--linearize", action="store_true", help="write a linearized (fast web view) PDF")
+
+    reverse = commands.add_parser("reverse", help="reverse the page order of a PDF")
+    reverse.add_argument("input", help="PDF file to reverse")
+    reverse.add_argument("-o", "--output", required=True, help="output PDF")
+    reverse.add_argument("--full-save", dest="incremental", action="store_false",
+                         help="rewrite the whole file instead of appending a reordered page tree")
+    reverse.add_argument("--linearize", action="store_true", help="write a linearized (fast web view) PDF")
+
+    reverse_batch_cmd = commands.add_parser("reverse-batch", help="reverse many PDFs in parallel")
+    reverse_batch_cmd.add_argument("inputs", nargs="+", help="PDF files and/or directories of PDFs")
+    reverse_batch_cmd.add_argument("--output-dir", help="write results here (default: next to each input)")
+    reverse_batch_cmd.add_argument("--suffix", default=DEFAULT_REVERSE_SUFFIX,
+                                   help=f"appended to output file names (default: {DEFAULT_REVERSE_SUFFIX})")
+    reverse_batch_cmd.add_argument("-j", "--jobs", type=int, default=None,
+                                   help="worker processes (default: one per CPU)")
+    reverse_batch_cmd.set_defaults(output=None)  # Each worker cleans up its own partial output
+
+    assemble = commands.add_parser("assemble", help="build a PDF from pages and images")
+    assemble.add_argument("specs", nargs="+", metavar="SPEC",
+                          help="file.pdf, file.pdf:1-3,7 or an image file")
+    assemble.add_argument("-o", "--output", required=True, help="output PDF")
+    assemble.add_argument("--stats", action="store_true", help="print parse counts and phase timings")
+    assemble.add_argument("--optimize", choices=list(OPTIMIZE_LEVELS), default=DEFAULT_OPTIMIZE_LEVEL,
+                          help="deduplicate and compress the output (default: none)")
+    assemble.add_argument("--linearize", action="store_true", help="write a linearized (fast web view) PDF")
+
+    sign = commands.add_parser("sign", help="stamp a signature image onto pages")
+    sign.add_argument("input", help="PDF file to sign")
+    sign.add_argument("--image", required=True, help="signature image")
+    sign.add_argument("--at", action="append", required=True, metavar="PAGE:X1,Y1,X2,Y2",
+                      help="one-based page and rectangle in points; may be repeated")
+    sign.add_argument("-o", "--output", required=True, help="output PDF")
+    sign.add_argument("--full-save", dest="incremental", action="store_false",
+                      help="rewrite the whole file instead of appending an incremental update")
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    ctx = ConsoleContext(quiet=args.quiet)
+    if args.trace or args.profile:
+        configure_tracing(args.trace, args.profile)
+
+    try:
+        if args.command == "merge":
+            merge_pdfs(args.inputs, args.output, ctx=ctx, streaming=args.streaming,
+                       memory_limit=args.memory_limit, backend=args.backend, optimize=args.optimize,
+                       linearize=args.linearize)
+        elif args.command == "reverse":
+            reverse_pdf(args.input, args.output, ctx=ctx, backend=args.backend, incremental=args.incremental,
+                        linearize=args.linearize)
+        elif args.command == "reverse-batch":
+            start = time.perf_counter()
+            results = reverse_batch(args.inputs, args.output_dir, args.suffix, args.jobs, ctx=ctx,
+                                    backend=args.backend)
+            for result in results:
+                print(throughput_line(result))
+            failed = sum(1 for result in results if result["error"])
+            pages = sum(result["pages"] for result in results)
+            elapsed = time.perf_counter() - start
+            print(f"{len(results) - failed} of {len(results)} files, {pages} pages in {elapsed:.2f}s "
+                  f"({pages / max(elapsed, 1e-9):.0f} pages/s)")
+            return 1 if failed else 0
+        elif args.command == "assemble":
+            pages = []
+            for spec in args.specs:
+                pages.extend(parse_page_spec(spec))
+            stats = AssemblyStats()
+            assemble_pages(pages, args.output, ctx=ctx, backend=args.backend, stats=stats,
+                           optimize=args.optimize, linearize=args.linearize)
+            if args.stats:
+                print(stats.summary())
+        elif args.command == "sign":
+            signatures = dict(parse_signature_spec(spec) for spec in args.at)
+            sign_pdf(args.input, args.image, signatures, args.output, ctx=ctx,
+                     incremental=args.incremental)
+    except (JobCancelled, KeyboardInterrupt):
+        if args.output:
+            remove_partial(args.output)
+        return 1
+    except Exception as e:
+        if args.output:
+            remove_partial(args.output)
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if not args.quiet:
+        print(f"Saved to: {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
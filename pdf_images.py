@@ -0,0 +1,77 @@
+"""In-memory conversion of image files into PDF pages.
+
+Images are decoded in parallel (Pillow releases the GIL while decoding) and
+inserted straight into a PyMuPDF document, with no temporary files and no
+re-parsing. Baseline JPEG data is embedded as-is, without re-encoding; other
+formats are decoded once to RGB samples and stored losslessly.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+# JPEG colour modes that PDF viewers can display from the original bytes
+PASSTHROUGH_JPEG_MODES = ("RGB", "L", "CMYK")
+
+
+class PreparedImage:
+    """An image ready to become a page: either raw JPEG bytes or RGB samples"""
+
+    __slots__ = ("path", "width", "height", "jpeg", "samples")
+
+    def __init__(self, path, width, height, jpeg=None, samples=None):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.jpeg = jpeg
+        self.samples = samples
+
+    @property
+    def passthrough(self):
+        return self.jpeg is not None
+
+
+def prepare_image(image_path):
+    """Read an image file and return a PreparedImage for it"""
+    with Image.open(image_path) as img:
+        width, height = img.size
+        if img.format == "JPEG" and img.mode in PASSTHROUGH_JPEG_MODES:
+            # Only the header has been read; embed the file's bytes unchanged
+            with open(image_path, "rb") as f:
+                return PreparedImage(image_path, width, height, jpeg=f.read())
+        rgb = img.convert("RGB")
+    return PreparedImage(image_path, width, height, samples=rgb.tobytes())
+
+
+def prepare_images(image_paths, workers=None):
+    """Prepare several images in parallel; returns a dict keyed by path"""
+    unique_paths = list(dict.fromkeys(image_paths))
+    if not unique_paths:
+        return {}
+    workers = workers or min(len(unique_paths), os.cpu_count() or 1)
+    if workers <= 1:
+        return {path: prepare_image(path) for path in unique_paths}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-image") as pool:
+        return dict(zip(unique_paths, pool.map(prepare_image, unique_paths)))
+
+
+def insert_prepared_image(doc, prepared):
+    """Append a page sized to the image (one point per pixel) showing it"""
+    page = doc.new_page(width=prepared.width, height=prepared.height)
+    if prepared.passthrough:
+        page.insert_image(page.rect, stream=prepared.jpeg)
+    else:
+        # Copy the decoded samples straight into a MuPDF pixmap
+        pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, prepared.width, prepared.height), False)
+        pixmap.samples_mv[:] = prepared.samples
+        page.insert_image(page.rect, pixmap=pixmap)
+    return page
+
+
+def images_to_pdf_bytes(prepared_images):
+    """Build an in-memory PDF with one page per prepared image, in order"""
+    with fitz.open() as doc:
+        for prepared in prepared_images:
+            insert_prepared_image(doc, prepared)
+        return doc.tobytes()
@@ -0,0 +1,176 @@
+"""Append-only incremental updates of PDF files.
+
+An incremental update leaves every byte of the original file in place and
+appends the objects that changed, a new cross-reference section and a
+trailer pointing back to the previous one. Saving costs time proportional to
+the change rather than to the file, and existing digital signatures stay
+valid.
+
+MuPDF records the objects changed since a document was opened in an
+incremental section of its xref. ``save_incremental`` writes exactly those
+objects. PyMuPDF's own ``saveIncr`` produces the same kind of update but
+re-reads the whole file while doing so, which on large files takes longer
+than a full rewrite; it is only used as a fallback here.
+"""
+import hashlib
+import os
+import re
+import time
+
+try:
+    from fitz import mupdf
+except ImportError:  # PyMuPDF builds without the low-level MuPDF bindings
+    mupdf = None
+
+# The last startxref is searched for in this many bytes at the end of the file
+TAIL_BYTES = 4096
+
+STARTXREF_PATTERN = re.compile(rb"startxref\s+(\d+)")
+
+
+def last_xref_offset(path):
+    """Return (offset, is_stream) for the file's last cross-reference section"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - TAIL_BYTES))
+        matches = STARTXREF_PATTERN.findall(f.read())
+        if not matches:
+            raise ValueError(f"{path} has no startxref")
+        offset = int(matches[-1])
+        f.seek(offset)
+        is_stream = not f.read(4).startswith(b"xref")
+    return offset, is_stream
+
+
+def can_append(doc):
+    """True when save_incremental can write doc's changes itself"""
+    return (mupdf is not None and doc.is_pdf and not doc.is_encrypted
+            and doc.xref_get_key(-1, "Encrypt")[0] == "null"
+            and doc.can_save_incrementally())
+
+
+def changed_xrefs(doc):
+    """Return (xref, generation) for objects changed since doc was opened"""
+    if not doc.is_dirty:
+        return []
+    pdf = mupdf.pdf_document_from_fz_document(doc.this)
+    changed = []
+    for xref in range(1, doc.xref_length()):
+        if mupdf.pdf_xref_is_incremental(pdf, xref):
+            entry = mupdf.ll_pdf_get_xref_entry_no_null(pdf.m_internal, xref)
+            # Objects stored in object streams always have generation 0
+            # (their entry's gen field holds the index within the stream)
+            changed.append((xref, 0 if entry.type == "o" else entry.gen))
+    return changed
+
+
+def object_bytes(doc, xref, gen):
+    """Serialize one object as it should appear in the update (deleted ones become null)"""
+    head = f"{xref} {gen} obj\n".encode()
+    if not doc.xref_is_stream(xref):
+        return head + doc.xref_object(xref, compressed=True).encode() + b"\nendobj\n"
+    raw = doc.xref_stream_raw(xref)
+    doc.xref_set_key(xref, "Length", str(len(raw)))
+    return (head + doc.xref_object(xref, compressed=True).encode()
+            + b"\nstream\n" + raw + b"\nendstream\nendobj\n")
+
+
+def trailer_entries(doc, prev):
+    """Trailer keys for the update: the original ones plus a fresh /ID and /Prev"""
+    entries = {"Size": str(doc.xref_length()), "Root": doc.xref_get_key(-1, "Root")[1]}
+    info = doc.xref_get_key(-1, "Info")
+    if info[0] != "null":
+        entries["Info"] = info[1]
+
+    # Keep the permanent identifier; the second one changes with every update
+    ids = re.findall(r"<([0-9A-Fa-f]*)>", doc.xref_get_key(-1, "ID")[1])
+    update_id = hashlib.md5(f"{doc.name}|{prev}|{time.time_ns()}".encode()).hexdigest()
+    entries["ID"] = f"[<{ids[0] if ids else update_id}><{update_id}>]"
+    entries["Prev"] = str(prev)
+    return entries
+
+
+def subsections(numbers):
+    """Group sorted object numbers into (first, count) runs"""
+    runs = []
+    for number in numbers:
+        if runs and number == runs[-1][0] + runs[-1][1]:
+            runs[-1][1] += 1
+        else:
+            runs.append([number, 1])
+    return runs
+
+
+def xref_table(entries, trailer):
+    """Classic cross-reference table followed by the trailer dictionary"""
+    lines = [b"xref\n"]
+    for first, count in subsections([0] + sorted(entries)):
+        lines.append(f"{first} {count}\n".encode())
+        for number in range(first, first + count):
+            if number == 0:
+                lines.append(b"0000000000 65535 f\r\n")  # Head of the free list, by convention
+                continue
+            offset, gen = entries[number]
+            lines.append(f"{offset:010d} {gen:05d} n\r\n".encode())
+    keys = " ".join(f"/{key} {value}" for key, value in trailer.items())
+    lines.append(f"trailer\n<< {keys} >>\n".encode())
+    return b"".join(lines)
+
+
+def xref_stream(number, offset, entries, trailer):
+    """Cross-reference stream object for files whose original xref is a stream"""
+    entries = dict(entries)
+    entries[number] = (offset, 0)
+    trailer = dict(trailer, Size=str(number + 1))
+    offset_width = max(4, (max(ofs for ofs, _ in entries.values()).bit_length() + 7) // 8)
+
+    index = []
+    data = []
+    for first, count in subsections(sorted(entries)):
+        index.append(f"{first} {count}")
+        for n in range(first, first + count):
+            ofs, gen = entries[n]
+            data.append(b"\x01" + ofs.to_bytes(offset_width, "big") + gen.to_bytes(2, "big"))
+    data = b"".join(data)
+
+    keys = " ".join(f"/{key} {value}" for key, value in trailer.items())
+    head = (f"{number} 0 obj\n<< /Type /XRef {keys} /Index [{' '.join(index)}] "
+            f"/W [1 {offset_width} 2] /Length {len(data)} >>\nstream\n")
+    return head.encode() + data + b"\nendstream\nendobj\n"
+
+
+def save_incremental(doc):
+    """Append doc's changes to the file it was opened from.
+
+    Returns the number of bytes appended. The document should be closed
+    afterwards; it does not know about the bytes written behind its back.
+    """
+    if not can_append(doc):
+        size = os.path.getsize(doc.name)
+        doc.saveIncr()
+        return os.path.getsize(doc.name) - size
+
+    changed = changed_xrefs(doc)
+    if not changed:
+        return 0
+    prev, prev_is_stream = last_xref_offset(doc.name)
+    trailer = trailer_entries(doc, prev)
+
+    with open(doc.name, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        start = f.tell() + 1
+        if f.read(1) not in (b"\n", b"\r"):
+            f.write(b"\n")
+
+        entries = {}
+        for xref, gen in changed:
+            entries[xref] = (f.tell(), gen)
+            f.write(object_bytes(doc, xref, gen))
+
+        xref_offset = f.tell()
+        if prev_is_stream:
+            f.write(xref_stream(doc.xref_length(), xref_offset, entries, trailer))
+        else:
+            f.write(xref_table(entries, trailer))
+        f.write(f"startxref\n{xref_offset}\n%%EOF\n".encode())
+        return f.tell() - start
@@ -1,19 +1,33 @@
+import argparse
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from PyPDF2 import PdfReader, PdfWriter, PdfMerger
 import sys
 import ctypes
+import math
+from collections import OrderedDict, deque
 from PIL import Image, ImageTk
 import fitz  # PyMuPDF for better PDF rendering
-import io
-import tempfile
+import pdf_core
+from pdf_jobs import JobExecutor
+from pdf_optimize import DEFAULT_OPTIMIZE_LEVEL, OPTIMIZE_LEVELS
+from pdf_pagetable import PageTable
+from pdf_render import (TILE_SIZE, THUMBNAIL_SIZE, render_page, render_page_batch, render_tile,
+                        render_thumbnail_batch)
+from pdf_thumbcache import RenderCache, ThumbnailCache
+from pdf_trace import configure as configure_tracing, span, traced
+
 
 class PDFToolApp:
-    def __init__(self, root):
+    def __init__(self, root, editor_memory=None, optimize=DEFAULT_OPTIMIZE_LEVEL, linearize=False,
+                 render_workers=None):
         self.root = root
+        self.editor_memory = editor_memory
+        self.render_workers = render_workers
+        self.optimize = optimize
+        self.linearize = linearize
         self.root.title("PDF Wizard")
-        self.root.geometry("800x750")  # Increased height to accommodate Sign PDF section
+        self.root.geometry("800x790")  # Increased height to accommodate Sign PDF section and job status
         self.root.resizable(False, False)  # Disable window resizing
 
         # Color Palette
@@ -22,6 +36,10 @@ class PDFToolApp:
         # PDF Lists
         self.merge_pdf_list = []
 
+        # Shared background executor for merge, reverse, editor save and signing
+        self.jobs = JobExecutor(self.root)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Setup Styles
         self.setup_styles()
 
@@ -147,6 +165,21 @@ class PDFToolApp:
         ttk.Button(center_frame, text="Merge", command=self.merge_pdfs).pack(side=tk.LEFT, padx=5)
         ttk.Button(center_frame, text="Edit Pages", command=self.open_page_editor).pack(side=tk.LEFT, padx=5)
 
+        # Size optimization applied to merged and edited output
+        tk.Label(
+            center_frame, text="Optimize:", bg=self.BG_COLOR, fg=self.FONT_COLOR, font=self.bold_font
+        ).pack(side=tk.LEFT, padx=(15, 5))
+        self.optimize_var = tk.StringVar(value=self.optimize)
+        ttk.Combobox(center_frame, textvariable=self.optimize_var, values=list(OPTIMIZE_LEVELS),
+                     state="readonly", width=9).pack(side=tk.LEFT)
+
+        # Linearized output for merges, reverses and editor saves
+        self.linearize_var = tk.BooleanVar(value=self.linearize)
+        tk.Checkbutton(
+            center_frame, text="Fast web view", variable=self.linearize_var, bg=self.BG_COLOR,
+            fg=self.FONT_COLOR, activebackground=self.BG_COLOR, font=self.bold_font
+        ).pack(side=tk.LEFT, padx=(10, 0))
+
 
         # Separator
         tk.Frame(self.main_frame, bg=self.FONT_COLOR, height=2).pack(fill=tk.X, pady=10)
@@ -173,6 +206,7 @@ class PDFToolApp:
 
         ttk.Button(reverse_frame, text="Browse", command=self.select_reverse_pdf).pack(side=tk.LEFT, padx=5, pady=5)
         ttk.Button(reverse_frame, text="Reverse", command=self.reverse_pdf).pack(side=tk.RIGHT, padx=5, pady=5)
+        ttk.Button(reverse_frame, text="Reverse Folder", command=self.reverse_folder).pack(side=tk.RIGHT, padx=5, pady=5)
 
         # Separator
         tk.Frame(self.main_frame, bg=self.FONT_COLOR, height=2).pack(fill=tk.X, pady=10)
@@ -211,7 +245,58 @@ class PDFToolApp:
             mode="determinate",
             length=740
         )
-        self.progress_bar.pack(fill=tk.X, pady=(0, 10))
+        self.progress_bar.pack(fill=tk.X, pady=(0, 5))
+
+        # Job status and cancellation
+        job_frame = tk.Frame(progress_frame, bg=self.BG_COLOR)
+        job_frame.pack(fill=tk.X)
+
+        self.job_status_label = tk.Label(
+            job_frame, text="", bg=self.BG_COLOR, fg=self.FONT_COLOR, font=("Segoe UI", 9), anchor="w"
+        )
+        self.job_status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        self.cancel_button = ttk.Button(job_frame, text="Cancel", command=self.cancel_jobs, state="disabled")
+        self.cancel_button.pack(side=tk.RIGHT, padx=5)
+
+    def update_job_status(self, job=None):
+        """Reflect the state of all background jobs in the progress area"""
+        running = self.jobs.running
+        if not running:
+            self.job_status_label.config(text="")
+            self.cancel_button.configure(state="disabled")
+            return
+
+        self.progress_bar["value"] = self.jobs.overall_progress() * 100
+        self.cancel_button.configure(state="normal")
+
+        latest = job if job is not None and job in running else running[-1]
+        text = latest.message or latest.name
+        if len(running) > 1:
+            text += f"  ({len(running)} jobs running)"
+        self.job_status_label.config(text=text)
+
+    def on_job_finished(self, job):
+        """Refresh the progress area once a job leaves the executor"""
+        self.update_job_status()
+        if not self.jobs.running:
+            self.progress_bar["value"] = 100
+            self.root.after(1000, lambda: self.progress_bar.configure(value=0) if not self.jobs.running else None)
+
+    def cancel_jobs(self):
+        """Cancel every running background job"""
+        if self.jobs.running:
+            self.jobs.cancel_all()
+            self.job_status_label.config(text="Cancelling...")
+
+    def on_close(self):
+        """Stop background jobs before closing the application"""
+        if self.jobs.running and not messagebox.askyesno(
+            "Jobs Running", "Background jobs are still running. Cancel them and exit?"
+        ):
+            return
+        self.jobs.shutdown()
+        self.root.destroy()
 
     def reverse_list(self):
         """Reverse the order of PDFs in the list"""
@@ -286,68 +371,36 @@ class PDFToolApp:
             defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")], title="Save Merged PDF As"
         )
         if output_path:
-            try:
-                merger = PdfMerger()
-                total_files = len(self.merge_pdf_list)
-                
-                # Reset progress bar
-                self.progress_bar["value"] = 0
-                self.root.update_idletasks()
-                
-                # Disable all buttons during merging
-                for widget in self.root.winfo_children():
-                    if isinstance(widget, ttk.Button):
-                        widget.configure(state='disabled')
-                
-                for i, pdf_path in enumerate(self.merge_pdf_list):
-                    # Update progress before merging each file
-                    progress = ((i) / total_files) * 100
-                    self.progress_bar["value"] = progress
-                    self.root.update_idletasks()
-                    # self.root.after(200)  # Delay for visibility
-                    
-                    # Merge the PDF
-                    merger.append(pdf_path)
-                    
-                    # Update progress after merging each file
-                    progress = ((i + 1) / total_files) * 100
-                    self.progress_bar["value"] = progress
-                    self.root.update_idletasks()
-                    # self.root.after(200)  # Delay for visibility
-
-                # Show full progress before writing
-                self.progress_bar["value"] = 100
-                self.root.update_idletasks()
-                # self.root.after(500)  # Longer delay at completion
-                
-                # Write the merged PDF
-                with open(output_path, "wb") as output_file:
-                    merger.write(output_file)
-                
-                # Clear and update UI
-                self.merge_pdf_list.clear()
-                self.update_pdf_listbox()
-                
-                # Re-enable all buttons
-                for widget in self.root.winfo_children():
-                    if isinstance(widget, ttk.Button):
-                        widget.configure(state='normal')
-                
-                # Show success message
-                messagebox.showinfo("Success", f"PDFs merged successfully!\nSaved to: {output_path}")
-                
-                # Reset progress bar after success
-                self.root.after(1000, lambda: self.progress_bar.configure(value=0))
-                
-            except Exception as e:
-                # Re-enable buttons in case of error
-                for widget in self.root.winfo_children():
-                    if isinstance(widget, ttk.Button):
-                        widget.configure(state='normal')
-                        
-                messagebox.showerror("Error", f"An error occurred while merging PDFs:\n{str(e)}")
+            merge_list = self.merge_pdf_list.copy()
+            optimize = self.optimize_var.get()
+            linearize = self.linearize_var.get()
+
+            def on_done(job, result):
+                # Clear the list only if it was not edited while merging
+                if self.merge_pdf_list == merge_list:
+                    self.merge_pdf_list.clear()
+                    self.update_pdf_listbox()
+                self.on_job_finished(job)
+                message = f"PDFs merged successfully!\nSaved to: {result}"
+                if (optimize != "none" or linearize) and job.message:
+                    message += f"\n\n{job.message}"
+                messagebox.showinfo("Success", message)
+
+            def on_error(job, error):
+                self.on_job_finished(job)
+                messagebox.showerror("Error", f"An error occurred while merging PDFs:\n{str(error)}")
+
+            def on_cancel(job):
+                self.on_job_finished(job)
                 self.progress_bar["value"] = 0
-                self.root.update_idletasks()
+
+            self.jobs.submit(
+                f"Merging {len(merge_list)} PDFs", pdf_core.merge_pdfs, merge_list, output_path,
+                streaming=None, optimize=optimize, linearize=linearize, output_path=output_path,
+                on_progress=self.update_job_status,
+                on_done=on_done, on_error=on_error, on_cancel=on_cancel,
+            )
+            self.update_job_status()
 
     def select_reverse_pdf(self):
         file_path = filedialog.askopenfilename(title="Select PDF to Reverse", filetypes=[("PDF files", "*.pdf")])
@@ -365,20 +418,63 @@ class PDFToolApp:
             defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")], title="Save Reversed PDF As"
         )
         if output_path:
-            reader = PdfReader(input_path)
-            writer = PdfWriter()
+            def on_done(job, result):
+                self.on_job_finished(job)
+                messagebox.showinfo("Success", f"PDF reversed successfully!\nSaved to: {result}")
 
-            # Reverse the pages
-            for page_num in range(len(reader.pages) - 1, -1, -1):
-                writer.add_page(reader.pages[page_num])
+            def on_error(job, error):
+                self.on_job_finished(job)
+                messagebox.showerror("Error", f"An error occurred while reversing the PDF:\n{str(error)}")
 
-            with open(output_path, "wb") as output_file:
-                writer.write(output_file)
+            def on_cancel(job):
+                self.on_job_finished(job)
+                self.progress_bar["value"] = 0
 
-            # Remove the original file after reversing
-            # os.remove(input_path)
+            self.jobs.submit(
+                f"Reversing {os.path.basename(input_path)}", pdf_core.reverse_pdf, input_path, output_path,
+                linearize=self.linearize_var.get(), output_path=output_path, on_progress=self.update_job_status,
+                on_done=on_done, on_error=on_error, on_cancel=on_cancel,
+            )
+            self.update_job_status()
 
-            messagebox.showinfo("Success", f"PDF reversed successfully!\nSaved to: {output_path}")
+    def reverse_folder(self):
+        """Reverse every PDF in a folder, one background job per file"""
+        folder = filedialog.askdirectory(title="Select Folder of PDFs to Reverse")
+        if not folder:
+            return
+        input_paths = pdf_core.collect_pdfs([folder], skip_suffix=pdf_core.DEFAULT_REVERSE_SUFFIX)
+        if not input_paths:
+            messagebox.showwarning("Warning", "The folder contains no PDF files.")
+            return
+
+        outcome = {"done": 0, "failed": [], "left": len(input_paths)}
+
+        def finish(job):
+            self.on_job_finished(job)
+            outcome["left"] -= 1
+            if outcome["left"] == 0 and (outcome["done"] or outcome["failed"]):
+                message = f"Reversed {outcome['done']} of {len(input_paths)} PDFs in {folder}"
+                if outcome["failed"]:
+                    message += "\n\nFailed:\n" + "\n".join(outcome["failed"])
+                messagebox.showinfo("Reverse Folder", message)
+
+        def on_done(job, result):
+            outcome["done"] += 1
+            finish(job)
+
+        def on_error(job, error):
+            outcome["failed"].append(f"{job.name}: {error}")
+            finish(job)
+
+        linearize = self.linearize_var.get()
+        for input_path in input_paths:
+            output_path = pdf_core.batch_output_path(input_path)
+            self.jobs.submit(
+                f"Reversing {os.path.basename(input_path)}", pdf_core.reverse_pdf, input_path, output_path,
+                linearize=linearize, output_path=output_path, on_progress=self.update_job_status,
+                on_done=on_done, on_error=on_error, on_cancel=finish,
+            )
+        self.update_job_status()
 
     def open_page_editor(self):
         """Open the PDF page editor window"""
@@ -386,7 +482,9 @@ class PDFToolApp:
             messagebox.showwarning("Warning", "Please add PDFs to the list first.")
             return
         
-        editor = PDFPageEditor(self.root, self.merge_pdf_list.copy())
+        editor = PDFPageEditor(self.root, self.merge_pdf_list.copy(), jobs=self.jobs,
+                               render_workers=self.render_workers, memory_budget=self.editor_memory,
+                               optimize=self.optimize_var.get(), linearize=self.linearize_var.get())
     
     def select_sign_pdf(self):
         """Select a PDF file to sign"""
@@ -402,17 +500,141 @@ class PDFToolApp:
             messagebox.showwarning("Warning", "Please select a valid PDF file to sign!")
             return
         
-        signer = PDFSignerApp(self.root, pdf_path)
+        signer = PDFSignerApp(self.root, pdf_path, jobs=self.jobs)
+
+
+# Thumbnail render processes used by the page editor
+DEFAULT_RENDER_WORKERS = os.cpu_count() or 1
+RENDER_BATCH_PAGES = 16  # Pages of one source rendered per job
+
+# Thumbnail memory per editor window: decoded images plus Tk PhotoImages.
+# Half of it may hold decoded images; PhotoImages of pages out of view are
+# released beyond the budget and recreated when they scroll back in.
+DEFAULT_EDITOR_MEMORY = 256 * 1024 * 1024
+PHOTO_IMAGE_BYTES = THUMBNAIL_SIZE[0] * THUMBNAIL_SIZE[1] * 4  # Tk keeps 32-bit pixels
+
+# Signer page previews kept in memory, and the pages rendered ahead of the current one
+SIGNER_CACHE_BYTES = 128 * 1024 * 1024
+PREFETCH_OFFSETS = (1, -1, 2, -2)
+
+# Signer zoom: each step multiplies the zoom, up to this many times fit-to-window
+ZOOM_STEP = 1.25
+MAX_ZOOM_LEVEL = 16.0
+TILE_CACHE_BYTES = 64 * 1024 * 1024
+
+# Page editor grid geometry: [+] [Page] [+] [Page] ... [+] per row
+PAGES_PER_ROW = 5
+PAGE_CELL_WIDTH = 170
+INSERT_CELL_WIDTH = 50
+ROW_HEIGHT = 290
+GRID_WIDTH = PAGES_PER_ROW * PAGE_CELL_WIDTH + (PAGES_PER_ROW + 1) * INSERT_CELL_WIDTH
+OVERSCAN_ROWS = 1  # Rows kept alive above and below the viewport
+
+
+class ThumbnailTile:
+    """Recyclable widgets for one page cell and the '+' button after it"""
+    
+    def __init__(self, editor):
+        canvas = editor.canvas
+        self.canvas = canvas
+        self.index = None
+        self.page = None  # PageRef shown by the tile
+        self.state = None
+        self.draft_image = None  # Low-resolution preview shown until the sharp thumbnail arrives
+        
+        # Frame for the thumbnail with border
+        self.frame = tk.Frame(canvas, bg="white", relief=tk.SOLID, bd=2,
+                              highlightthickness=0, cursor="hand2")
+        
+        # Thumbnail label
+        self.thumb_label = tk.Label(self.frame, bg="white", cursor="hand2")
+        self.thumb_label.pack(padx=5, pady=5)
+        
+        # Page number badge
+        self.badge = tk.Label(self.frame, text="", bg="#2d8cf0",
+                              fg="white", font=("Segoe UI", 9, "bold"),
+                              padx=5, pady=2)
+        self.badge.pack()
+        
+        # Page info label
+        self.info_label = tk.Label(self.frame, text="", bg="white",
+                                   font=("Segoe UI", 7), wraplength=140, cursor="hand2")
+        self.info_label.pack(pady=(0, 5))
+        
+        # Let drag-and-drop map any widget back to its tile
+        for widget in (self.frame, self.thumb_label, self.badge, self.info_label):
+            widget.tile = self
+            editor.bind_drag_events(widget, self)
+        
+        self.frame_item = canvas.create_window(0, 0, window=self.frame, anchor="nw",
+                                               width=PAGE_CELL_WIDTH - 10, height=ROW_HEIGHT - 10,
+                                               state="hidden")
+        self.insert_item = editor.create_insert_button(lambda: self.index + 1)
+        canvas.itemconfigure(self.insert_item, state="hidden")
+    
+    def show(self, x, y):
+        """Place the tile with its page cell's top-left corner at (x, y)"""
+        self.canvas.coords(self.frame_item, x + 5, y + 5)
+        self.canvas.coords(self.insert_item, x + PAGE_CELL_WIDTH + 2, y + 2)
+        self.canvas.itemconfigure(self.frame_item, state="normal")
+        self.canvas.itemconfigure(self.insert_item, state="normal")
+    
+    def hide(self):
+        self.index = None
+        self.page = None
+        self.draft_image = None
+        self.canvas.itemconfigure(self.frame_item, state="hidden")
+        self.canvas.itemconfigure(self.insert_item, state="hidden")
+    
+    def set_state(self, selected=False, drop_target=False):
+        """Apply the normal, selected or drop-target look"""
+        state = "drop" if drop_target else "selected" if selected else "normal"
+        if state == self.state:
+            return
+        self.state = state
+        if drop_target:
+            self.frame.config(bg="#ffeb3b", relief=tk.SOLID, bd=3)
+            return
+        if selected:
+            self.frame.config(bg="#2d8cf0", relief=tk.SOLID, bd=3)
+            label_bg = "#e3f2fd"
+        else:
+            self.frame.config(bg="white", relief=tk.SOLID, bd=2)
+            label_bg = "white"
+        self.thumb_label.config(bg=label_bg)
+        self.info_label.config(bg=label_bg)
 
 
 class PDFPageEditor:
-    def __init__(self, parent, pdf_files):
+    def __init__(self, parent, pdf_files, jobs=None, render_workers=None, memory_budget=None,
+                 optimize=DEFAULT_OPTIMIZE_LEVEL, linearize=False):
         self.parent = parent
         self.pdf_files = pdf_files
-        self.pages = []  # List of page objects with metadata
+        self.optimize = optimize
+        self.linearize = linearize
+        self.jobs = jobs if jobs is not None else JobExecutor(parent)
+        self.save_job = None
+        self.thumbnail_cache = ThumbnailCache()
+        self.memory_budget = memory_budget or DEFAULT_EDITOR_MEMORY
+        self.render_cache = RenderCache(max_bytes=self.memory_budget // 2)
+        self.photos = OrderedDict()  # page key -> PhotoImage, least recently shown first
+        self.evictions = 0
+        self.render_count = 0  # Pages rasterized this session
+        self.pending_renders = set()  # Page keys queued in the render pool
+        self.pending_drafts = set()
+        self.failed_renders = set()
+        self.visible_requests = []
+        self.prefetch_queue = deque()
+        self.placeholder = None
+        
+        # Thumbnails render in their own process pool; 0 workers renders inline
+        if render_workers is None:
+            render_workers = DEFAULT_RENDER_WORKERS
+        self.render_workers = render_workers
+        self.renderer = JobExecutor(parent, max_workers=render_workers) if render_workers > 0 else None
+        self.pages = PageTable()  # Source and page number of every page, with undo history
         self.selected_page = None
         self.drag_data = {"x": 0, "y": 0, "item": None, "widget": None}
-        self.thumbnail_frames = []  # Store references to thumbnail frames
         
         # Create editor window
         self.window = tk.Toplevel(parent)
@@ -426,25 +648,23 @@ class PDFPageEditor:
         # Create UI
         self.create_editor_ui()
         
+        # The title bar's close button must also stop the render pool
+        self.window.protocol("WM_DELETE_WINDOW", self.close_editor)
+        
         # Make window modal
         self.window.transient(parent)
         self.window.grab_set()
         
+    @traced("PDFPageEditor.load_pages")
     def load_pages(self):
         """Load all pages from the PDF files"""
-        self.pages = []
+        self.pages = PageTable()
         for pdf_path in self.pdf_files:
             try:
-                doc = fitz.open(pdf_path)
-                for page_num in range(len(doc)):
-                    page_data = {
-                        'pdf_path': pdf_path,
-                        'page_num': page_num,
-                        'type': 'pdf',
-                        'doc': doc,
-                        'thumbnail': None
-                    }
-                    self.pages.append(page_data)
+                with fitz.open(pdf_path) as doc:
+                    page_count = len(doc)
+                # The initial pages are not an edit, so they cannot be undone
+                self.pages.append('pdf', pdf_path, range(page_count), record=False)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load {pdf_path}: {str(e)}")
     
@@ -466,6 +686,10 @@ class PDFPageEditor:
         ttk.Button(toolbar, text="Add Image", command=self.add_image).pack(side=tk.LEFT, padx=5)
         ttk.Button(toolbar, text="Add PDF", command=self.add_pdf).pack(side=tk.LEFT, padx=5)
         ttk.Button(toolbar, text="Delete Selected", command=self.delete_selected).pack(side=tk.LEFT, padx=5)
+        self.undo_button = ttk.Button(toolbar, text="Undo", command=self.undo)
+        self.undo_button.pack(side=tk.LEFT, padx=5)
+        self.redo_button = ttk.Button(toolbar, text="Redo", command=self.redo)
+        self.redo_button.pack(side=tk.LEFT, padx=5)
         ttk.Button(toolbar, text="Save PDF", command=self.save_pdf).pack(side=tk.RIGHT, padx=5)
         ttk.Button(toolbar, text="Cancel", command=self.close_editor).pack(side=tk.RIGHT, padx=5)
         
@@ -479,152 +703,340 @@ class PDFPageEditor:
         v_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=self.canvas.yview)
         h_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
         
-        self.canvas.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        # Re-layout the visible rows whenever the view scrolls
+        def on_yscroll(first, last):
+            v_scrollbar.set(first, last)
+            self.schedule_layout()
+        
+        self.canvas.configure(yscrollcommand=on_yscroll, xscrollcommand=h_scrollbar.set)
         
         # Pack scrollbars and canvas
         v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        # Create scrollable frame inside canvas
-        self.scrollable_frame = tk.Frame(self.canvas, bg="white")
-        self.canvas_window = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
+        # Status line for save progress
+        self.status_label = tk.Label(main_frame, text="", bg="#f0f0f0", anchor="w",
+                                     font=("Segoe UI", 9))
+        self.status_label.pack(fill=tk.X, pady=(5, 0))
+        
+        # Thumbnail tiles are placed directly on the canvas and only exist for
+        # rows in or near the viewport; they are recycled while scrolling
+        self.tiles = {}  # page index -> ThumbnailTile currently showing it
+        self.free_tiles = []
+        self.layout_pending = False
+        
+        # "+" button before the first page
+        self.first_insert_item = self.create_insert_button(lambda: 0)
         
         # Bind events
-        self.scrollable_frame.bind("<Configure>", self.on_frame_configure)
         self.canvas.bind("<Configure>", self.on_canvas_configure)
         self.canvas.bind("<MouseWheel>", self.on_mousewheel)
+        self.window.bind("<Control-z>", self.undo)
+        self.window.bind("<Control-y>", self.redo)
+        self.window.bind("<Control-Z>", self.redo)  # Ctrl+Shift+Z
         
-        # Generate thumbnails and display pages
+        # Display pages; visible thumbnails are requested first, then the rest in the background
         self.refresh_thumbnails()
-    
-    def on_frame_configure(self, event):
-        """Update scroll region when frame size changes"""
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        self.prefetch_queue.extend(self.pages)
+        self.window.after_idle(self.prefetch_thumbnails)
     
     def on_canvas_configure(self, event):
-        """Update canvas window width when canvas is resized"""
-        canvas_width = event.width
-        self.canvas.itemconfig(self.canvas_window, width=canvas_width)
+        """Re-center the grid and fill newly exposed rows when the canvas is resized"""
+        self.update_scrollregion()
+        self.layout_visible(reposition=True)
     
     def on_mousewheel(self, event):
         """Handle mouse wheel scrolling"""
         self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
     
-    def generate_thumbnail(self, page_data, size=(150, 200)):
-        """Generate thumbnail for a page"""
-        try:
-            if page_data['type'] == 'pdf':
-                # Get page from PDF
-                page = page_data['doc'][page_data['page_num']]
-                # Render page as image
-                mat = fitz.Matrix(1.0, 1.0)  # Scale factor
-                pix = page.get_pixmap(matrix=mat)
-                img_data = pix.tobytes("ppm")
-                img = Image.open(io.BytesIO(img_data))
-            elif page_data['type'] == 'image':
-                img = Image.open(page_data['image_path'])
-            
-            # Resize to thumbnail size while maintaining aspect ratio
-            img.thumbnail(size, Image.Resampling.LANCZOS)
-            
-            # Create a white background and paste the image centered
-            thumb = Image.new('RGB', size, 'white')
-            x = (size[0] - img.width) // 2
-            y = (size[1] - img.height) // 2
-            thumb.paste(img, (x, y))
-            
-            return ImageTk.PhotoImage(thumb)
-        except Exception as e:
-            print(f"Error generating thumbnail: {e}")
-            # Return a placeholder image
-            placeholder = Image.new('RGB', size, '#f0f0f0')
-            return ImageTk.PhotoImage(placeholder)
+    def grid_origin(self):
+        """X offset that centers the grid in the canvas"""
+        return max(0, (self.canvas.winfo_width() - GRID_WIDTH) // 2)
+    
+    def cell_origin(self, index):
+        """Top-left canvas coordinates of the cell holding page ``index``"""
+        row, col = divmod(index, PAGES_PER_ROW)
+        x = self.grid_origin() + INSERT_CELL_WIDTH + col * (PAGE_CELL_WIDTH + INSERT_CELL_WIDTH)
+        return x, row * ROW_HEIGHT
+    
+    def update_scrollregion(self):
+        """Size the scroll region for the full page list without creating widgets"""
+        rows = max(1, -(-len(self.pages) // PAGES_PER_ROW))
+        width = max(GRID_WIDTH, self.canvas.winfo_width())
+        self.canvas.configure(scrollregion=(0, 0, width, rows * ROW_HEIGHT))
     
+    def visible_range(self):
+        """Page indices in or near the viewport, as a half-open range"""
+        top = self.canvas.canvasy(0)
+        height = max(self.canvas.winfo_height(), ROW_HEIGHT)
+        first_row = max(0, int(top // ROW_HEIGHT) - OVERSCAN_ROWS)
+        last_row = int((top + height) // ROW_HEIGHT) + OVERSCAN_ROWS
+        return first_row * PAGES_PER_ROW, min(len(self.pages), (last_row + 1) * PAGES_PER_ROW)
+    
+    def schedule_layout(self):
+        """Coalesce scroll events into one layout pass when Tk is idle"""
+        if not self.layout_pending:
+            self.layout_pending = True
+            self.window.after_idle(self.layout_visible)
+    
+    @traced("PDFPageEditor.layout_visible")
+    def layout_visible(self, reposition=False):
+        """Bring the visible rows up to date with the fewest widget changes.
+        
+        Tiles follow their page: a tile whose page is still in view is only
+        moved and renumbered, tiles whose page left the view (or the document)
+        are recycled, and only newly exposed pages get a tile filled. With
+        ``reposition`` every tile is placed again, e.g. after a resize.
+        """
+        self.layout_pending = False
+        if not self.canvas.winfo_exists():
+            return
+        start, end = self.visible_range()
+        wanted = {self.pages.row_id(i): i for i in range(start, end)}
+        
+        placed = {}
+        for tile in self.tiles.values():
+            new_index = wanted.get(tile.page.row)
+            if new_index is None:
+                # Page scrolled away or was removed
+                tile.hide()
+                self.free_tiles.append(tile)
+            else:
+                if new_index != tile.index or reposition:
+                    self.move_tile(tile, new_index)
+                placed[new_index] = tile
+        
+        for index in range(start, end):
+            if index not in placed:
+                tile = self.free_tiles.pop() if self.free_tiles else ThumbnailTile(self)
+                self.fill_tile(tile, index)
+                placed[index] = tile
+        self.tiles = placed
+        self.enforce_memory_budget()
+        
+        x0 = self.grid_origin()
+        self.canvas.coords(self.first_insert_item, x0 + 2, 2)
+    
+    def fill_tile(self, tile, index):
+        """Point a tile at page ``index`` and place it in its cell"""
+        page = self.pages[index]
+        
+        if page.type == 'pdf':
+            info_text = f"{os.path.basename(page.path)}\nPage {page.page_num + 1}"
+        else:
+            info_text = f"{os.path.basename(page.path)}"
+        
+        tile.page = page
+        tile.draft_image = None
+        tile.thumb_label.config(image=self.thumbnail_for(page))
+        tile.info_label.config(text=info_text)
+        self.move_tile(tile, index)
+    
+    def move_tile(self, tile, index):
+        """Renumber a tile and move it to the cell for page ``index``"""
+        tile.index = index
+        tile.badge.config(text=f"#{index+1}")
+        tile.set_state(selected=index == self.selected_page)
+        
+        x, y = self.cell_origin(index)
+        tile.show(x, y)
+    
+    @traced("PDFPageEditor.refresh_thumbnails")
     def refresh_thumbnails(self):
-        """Refresh the thumbnail display with drag-and-drop and insert buttons"""
-        # Clear existing thumbnails
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        
-        self.thumbnail_frames = []
-        
-        # Create grid layout: each row has alternating + buttons and thumbnails
-        # Pattern: [+] [Page] [+] [Page] [+] [Page] [+]
-        cols = 11  # 5 pages + 6 insert buttons per row
-        page_cols = [1, 3, 5, 7, 9]  # Columns for pages
-        insert_cols = [0, 2, 4, 6, 8, 10]  # Columns for + buttons
-        
-        pages_per_row = 5
-        current_row = 0
-        
-        # Add initial "+" button at position 0
-        self.create_insert_button(current_row, 0, 0)
-        
-        for i, page_data in enumerate(self.pages):
-            # Calculate position
-            page_in_row = i % pages_per_row
-            current_row = i // pages_per_row
-            col = page_cols[page_in_row]
-            
-            # Generate thumbnail
-            thumbnail = self.generate_thumbnail(page_data)
-            page_data['thumbnail'] = thumbnail
-            
-            # Create container frame for thumbnail
-            container = tk.Frame(self.scrollable_frame, bg="white")
-            container.grid(row=current_row, column=col, padx=2, pady=2, sticky="nsew")
-            
-            # Create frame for each thumbnail with border
-            thumb_frame = tk.Frame(container, bg="white", relief=tk.SOLID, bd=2, 
-                                  highlightthickness=0, cursor="hand2")
-            thumb_frame.pack(fill=tk.BOTH, expand=True, padx=3, pady=3)
-            
-            # Store reference
-            self.thumbnail_frames.append(thumb_frame)
-            
-            # Thumbnail label
-            thumb_label = tk.Label(thumb_frame, image=thumbnail, bg="white", cursor="hand2")
-            thumb_label.pack(padx=5, pady=5)
-            
-            # Page number badge
-            page_num_label = tk.Label(thumb_frame, text=f"#{i+1}", bg="#2d8cf0", 
-                                     fg="white", font=("Segoe UI", 9, "bold"), 
-                                     padx=5, pady=2)
-            page_num_label.pack()
-            
-            # Page info label
-            if page_data['type'] == 'pdf':
-                info_text = f"{os.path.basename(page_data['pdf_path'])}\nPage {page_data['page_num'] + 1}"
+        """Update the thumbnail display after the page list changed"""
+        self.update_scrollregion()
+        self.layout_visible()
+        self.highlight_selected(self.selected_page)
+        self.undo_button.state(["!disabled"] if self.pages.can_undo else ["disabled"])
+        self.redo_button.state(["!disabled"] if self.pages.can_redo else ["disabled"])
+        self.show_cache_stats()
+    
+    def page_key(self, page, size=THUMBNAIL_SIZE):
+        """Identity of what a page shows, independent of its position"""
+        return (page.path, page.page_num, size)
+    
+    def placeholder_image(self):
+        """Shared image shown while a thumbnail is still rendering"""
+        if self.placeholder is None:
+            self.placeholder = ImageTk.PhotoImage(Image.new('RGB', THUMBNAIL_SIZE, '#f0f0f0'))
+        return self.placeholder
+    
+    def thumbnail_for(self, page):
+        """Return the page's thumbnail, or a placeholder while it renders in the background"""
+        key = self.page_key(page)
+        thumbnail = self.photos.get(key)
+        if thumbnail is not None:
+            self.photos.move_to_end(key)
+            return thumbnail
+        
+        thumb = self.render_cache.get(key)
+        if thumb is None:
+            if self.renderer is not None:
+                # Batch the pages that become visible together into as few jobs as possible
+                if not self.visible_requests:
+                    self.window.after_idle(self.flush_visible_requests)
+                self.visible_requests.append(page)
+                return self.placeholder_image()
+            self.request_thumbnails([page])
+            thumb = self.render_cache.get(key)
+            if thumb is None:
+                return self.placeholder_image()
+        
+        return self.store_thumbnail(key, thumb)
+    
+    def store_thumbnail(self, key, thumb):
+        """Keep a PhotoImage of ``thumb`` for every page showing ``key`` and count it against the budget"""
+        thumbnail = ImageTk.PhotoImage(thumb)
+        self.photos[key] = thumbnail
+        return thumbnail
+    
+    def memory_usage(self):
+        """Bytes held by decoded thumbnails and PhotoImages"""
+        return self.render_cache.total_bytes + len(self.photos) * PHOTO_IMAGE_BYTES
+    
+    def enforce_memory_budget(self):
+        """Release the least recently shown PhotoImages of pages out of view while over budget.
+        
+        Pages scrolled back into view get their thumbnail again from the
+        in-memory or on-disk cache, or are re-rendered.
+        """
+        if self.memory_usage() <= self.memory_budget:
+            return
+        in_view = {self.page_key(tile.page) for tile in self.tiles.values()}
+        for key in list(self.photos):
+            if self.memory_usage() <= self.memory_budget:
+                break
+            if key in in_view:
+                continue
+            del self.photos[key]
+            self.evictions += 1
+        self.show_cache_stats()
+    
+    def flush_visible_requests(self):
+        """Render newly visible pages: a quick draft pass first, then the sharp one"""
+        pages = self.visible_requests
+        self.visible_requests = []
+        self.request_thumbnails(pages, draft=True)
+        self.request_thumbnails(pages)
+    
+    def prefetch_thumbnails(self):
+        """Feed off-screen pages to the render pool a few batches at a time.
+        
+        Keeping the pool's queue short lets pages that scroll into view jump
+        ahead of the rest of the document.
+        """
+        if self.renderer is None:
+            return
+        while self.prefetch_queue and len(self.renderer.running) < self.render_workers * 2:
+            count = min(RENDER_BATCH_PAGES, len(self.prefetch_queue))
+            self.request_thumbnails([self.prefetch_queue.popleft() for _ in range(count)])
+    
+    def request_thumbnails(self, pages, draft=False):
+        """Render missing thumbnails in the worker pool, in batches that each cover one source"""
+        if draft and self.renderer is None:
+            return
+        pending = self.pending_drafts if draft else self.pending_renders
+        batches = {}
+        for page in pages:
+            key = self.page_key(page)
+            if (key in self.photos or key in self.render_cache
+                    or key in pending or key in self.failed_renders):
+                continue
+            pending.add(key)
+            batches.setdefault((page.type, page.path), []).append(page.page_num)
+        
+        cache_dir = self.thumbnail_cache.cache_dir
+        for (kind, path), page_nums in batches.items():
+            for i in range(0, len(page_nums), RENDER_BATCH_PAGES):
+                chunk = page_nums[i:i + RENDER_BATCH_PAGES]
+                if self.renderer is None:
+                    results = render_thumbnail_batch(kind, path, chunk, THUMBNAIL_SIZE, cache_dir)
+                    self.on_thumbnails_rendered(path, results)
+                    continue
+                self.renderer.submit(
+                    f"Rendering {os.path.basename(path)}", render_thumbnail_batch,
+                    kind, path, chunk, THUMBNAIL_SIZE, cache_dir, draft=draft,
+                    on_done=lambda job, results, path=path: self.on_thumbnails_rendered(path, results, draft),
+                    on_error=lambda job, error, path=path, chunk=chunk: self.on_render_failed(path, chunk, error, draft),
+                )
+        if batches:
+            self.show_cache_stats()
+    
+    @traced("PDFPageEditor.on_thumbnails_rendered")
+    def on_thumbnails_rendered(self, path, results, draft=False):
+        """Store finished thumbnails and swap them into any visible placeholders"""
+        ready = {}
+        drafts = {}
+        for page_num, data, from_cache in results:
+            key = (path, page_num, THUMBNAIL_SIZE)
+            if draft:
+                self.pending_drafts.discard(key)
             else:
-                info_text = f"{os.path.basename(page_data['image_path'])}"
-            
-            info_label = tk.Label(thumb_frame, text=info_text, bg="white", 
-                                 font=("Segoe UI", 7), wraplength=140, cursor="hand2")
-            info_label.pack(pady=(0, 5))
+                self.pending_renders.discard(key)
+                self.thumbnail_cache.record(from_cache)
+            if data is None:
+                if not draft:
+                    self.failed_renders.add(key)
+                continue
             
-            # Bind drag and drop events to all widgets in the frame
-            self.bind_drag_events(thumb_frame, i)
-            self.bind_drag_events(thumb_label, i)
-            self.bind_drag_events(info_label, i)
-            self.bind_drag_events(page_num_label, i)
-            
-            # Add "+" button after this page
-            insert_col = insert_cols[page_in_row + 1]
-            self.create_insert_button(current_row, insert_col, i + 1)
-        
-        # Configure grid weights for responsive layout
-        for col in range(cols):
-            if col in page_cols:
-                self.scrollable_frame.columnconfigure(col, weight=3, minsize=170)
+            thumb = Image.frombytes('RGB', THUMBNAIL_SIZE, data)
+            if draft and not from_cache:
+                # The sharp batch may have landed first; a late draft must not replace it
+                if key not in self.render_cache and key not in self.photos:
+                    drafts[key] = thumb
+                continue
+            if key in self.render_cache:
+                continue  # A draft batch already found it in the disk cache
+            if not from_cache:
+                self.render_count += 1
+            self.render_cache.put(key, thumb)
+            ready[key] = thumb
+        
+        for tile in self.tiles.values():
+            if tile.page is None:
+                continue
+            key = self.page_key(tile.page)
+            if key in ready:
+                tile.draft_image = None
+                thumbnail = self.photos.get(key) or self.store_thumbnail(key, ready[key])
+                tile.thumb_label.config(image=thumbnail)
+            elif key in drafts:
+                # Shown until the sharp render arrives; never kept with the page
+                tile.draft_image = ImageTk.PhotoImage(drafts[key])
+                tile.thumb_label.config(image=tile.draft_image)
+        
+        self.enforce_memory_budget()
+        self.show_cache_stats()
+        self.prefetch_thumbnails()
+    
+    def on_render_failed(self, path, page_nums, error, draft=False):
+        """Keep placeholders for pages whose render batch failed"""
+        print(f"Error generating thumbnails for {path}: {error}")
+        for page_num in page_nums:
+            key = (path, page_num, THUMBNAIL_SIZE)
+            if draft:
+                self.pending_drafts.discard(key)
             else:
-                self.scrollable_frame.columnconfigure(col, weight=1, minsize=50)
+                self.pending_renders.discard(key)
+                self.failed_renders.add(key)
+        self.show_cache_stats()
+        self.prefetch_thumbnails()
     
-    def create_insert_button(self, row, col, insert_position):
-        """Create a '+' button for inserting pages"""
+    def show_cache_stats(self):
+        """Show thumbnail cache hit/miss counts in the status line"""
+        if self.save_job is None:
+            text = f"{self.thumbnail_cache.stats_text()}  |  {self.render_count} pages rendered this session"
+            if self.pending_renders:
+                text += f"  |  {len(self.pending_renders)} thumbnails pending"
+            text += (f"  |  Memory {self.memory_usage() / 2**20:.0f} of {self.memory_budget / 2**20:.0f} MB "
+                     f"({len(self.photos)} images shown, {self.evictions} released)")
+            self.status_label.config(text=text)
+    
+    def create_insert_button(self, get_position):
+        """Create a '+' button for inserting pages and return its canvas item"""
         # Create a small frame for the insert button
-        insert_frame = tk.Frame(self.scrollable_frame, bg="white")
-        insert_frame.grid(row=row, column=col, sticky="nsew", padx=2, pady=2)
+        insert_frame = tk.Frame(self.canvas, bg="white")
         
         # Create the '+' button with better styling
         plus_btn = tk.Label(insert_frame, text="+", font=("Segoe UI", 20, "bold"),
@@ -632,18 +1044,33 @@ class PDFPageEditor:
                            relief=tk.RAISED, bd=2, width=2, height=8)
         plus_btn.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
         
-        # Bind click event
-        plus_btn.bind("<Button-1>", lambda e: self.insert_at_position(insert_position))
+        # Bind click event; the position is looked up at click time since tiles are recycled
+        plus_btn.bind("<Button-1>", lambda e: self.insert_at_position(get_position()))
+        plus_btn.bind("<MouseWheel>", self.on_mousewheel)
         
         # Hover effects
         plus_btn.bind("<Enter>", lambda e: plus_btn.config(bg="#2d8cf0", fg="white", relief=tk.RAISED, bd=3))
         plus_btn.bind("<Leave>", lambda e: plus_btn.config(bg="#e8e8e8", fg="#2d8cf0", relief=tk.RAISED, bd=2))
+        
+        return self.canvas.create_window(0, 0, window=insert_frame, anchor="nw",
+                                         width=INSERT_CELL_WIDTH - 4, height=ROW_HEIGHT - 4)
+    
+    def bind_drag_events(self, widget, tile):
+        """Bind drag and drop events to a widget of a recyclable tile"""
+        widget.bind("<Button-1>", lambda e: self.on_click(e, tile.index))
+        widget.bind("<B1-Motion>", lambda e: self.on_drag(e, tile.index))
+        widget.bind("<ButtonRelease-1>", lambda e: self.on_drop(e, tile.index))
+        widget.bind("<MouseWheel>", self.on_mousewheel)
     
-    def bind_drag_events(self, widget, page_index):
-        """Bind drag and drop events to a widget"""
-        widget.bind("<Button-1>", lambda e: self.on_click(e, page_index))
-        widget.bind("<B1-Motion>", lambda e: self.on_drag(e, page_index))
-        widget.bind("<ButtonRelease-1>", lambda e: self.on_drop(e, page_index))
+    def tile_at(self, x_root, y_root):
+        """Return the tile under the given screen position, if any"""
+        widget = self.window.winfo_containing(x_root, y_root)
+        while widget is not None and widget is not self.canvas:
+            tile = getattr(widget, "tile", None)
+            if tile is not None and tile.index is not None:
+                return tile
+            widget = widget.master
+        return None
     
     def on_click(self, event, page_index):
         """Handle mouse click on thumbnail"""
@@ -665,36 +1092,25 @@ class PDFPageEditor:
             # Check if we've moved enough to consider it a drag
             if abs(dx) > 10 or abs(dy) > 10:
                 # Find which thumbnail we're hovering over
-                widget_under_mouse = event.widget.winfo_containing(event.x_root, event.y_root)
+                target = self.tile_at(event.x_root, event.y_root)
                 
                 # Visual feedback - highlight potential drop target
-                for i, frame in enumerate(self.thumbnail_frames):
-                    if widget_under_mouse in [frame] + list(frame.winfo_children()):
-                        if i != page_index:
-                            frame.config(bg="#ffeb3b", relief=tk.SOLID, bd=3)
+                for tile in self.tiles.values():
+                    if tile is target and tile.index != page_index:
+                        tile.set_state(drop_target=True)
                     else:
-                        if i == self.selected_page:
-                            frame.config(bg="#2d8cf0", relief=tk.SOLID, bd=3)
-                        else:
-                            frame.config(bg="white", relief=tk.SOLID, bd=2)
+                        tile.set_state(selected=tile.index == self.selected_page)
     
     def on_drop(self, event, page_index):
         """Handle drop event"""
         if self.drag_data["item"] is not None:
             # Find which thumbnail we dropped on
-            widget_under_mouse = event.widget.winfo_containing(event.x_root, event.y_root)
-            
-            drop_index = None
-            for i, frame in enumerate(self.thumbnail_frames):
-                if widget_under_mouse in [frame] + list(frame.winfo_children()):
-                    drop_index = i
-                    break
+            target = self.tile_at(event.x_root, event.y_root)
+            drop_index = target.index if target is not None else None
             
             # Reorder pages if we found a valid drop target
             if drop_index is not None and drop_index != self.drag_data["item"]:
-                dragged_page = self.pages.pop(self.drag_data["item"])
-                self.pages.insert(drop_index, dragged_page)
-                self.selected_page = drop_index
+                self.selected_page = self.pages.move(self.drag_data["item"], drop_index)
                 
                 # Refresh display
                 self.refresh_thumbnails()
@@ -706,18 +1122,8 @@ class PDFPageEditor:
     
     def highlight_selected(self, page_index):
         """Highlight the selected thumbnail"""
-        for i, frame in enumerate(self.thumbnail_frames):
-            if i == page_index:
-                frame.config(bg="#2d8cf0", relief=tk.SOLID, bd=3)
-                # Update all child widgets background
-                for child in frame.winfo_children():
-                    if isinstance(child, tk.Label) and child.cget("text") != f"#{i+1}":
-                        child.config(bg="#e3f2fd")
-            else:
-                frame.config(bg="white", relief=tk.SOLID, bd=2)
-                for child in frame.winfo_children():
-                    if isinstance(child, tk.Label) and child.cget("text") != f"#{i+1}":
-                        child.config(bg="white")
+        for tile in self.tiles.values():
+            tile.set_state(selected=tile.index == page_index)
     
     def insert_at_position(self, position):
         """Show dialog to insert image or PDF at specific position"""
@@ -759,13 +1165,7 @@ class PDFPageEditor:
         )
         
         if file_path:
-            page_data = {
-                'image_path': file_path,
-                'type': 'image',
-                'thumbnail': None
-            }
-            self.pages.insert(position, page_data)
-            self.selected_page = position
+            self.selected_page = self.pages.insert(position, 'image', file_path, [0])
             self.refresh_thumbnails()
     
     def add_pdf(self):
@@ -783,18 +1183,10 @@ class PDFPageEditor:
         
         if file_path:
             try:
-                doc = fitz.open(file_path)
-                # Add all pages from the PDF
-                for page_num in range(len(doc)):
-                    page_data = {
-                        'pdf_path': file_path,
-                        'page_num': page_num,
-                        'type': 'pdf',
-                        'doc': doc,
-                        'thumbnail': None
-                    }
-                    self.pages.insert(position + page_num, page_data)
-                self.selected_page = position
+                with fitz.open(file_path) as doc:
+                    page_count = len(doc)
+                # Add all pages from the PDF as one undoable edit
+                self.selected_page = self.pages.insert(position, 'pdf', file_path, range(page_count))
                 self.refresh_thumbnails()
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load PDF: {str(e)}")
@@ -840,18 +1232,34 @@ class PDFPageEditor:
         """Delete the selected page"""
         if self.selected_page is not None and 0 <= self.selected_page < len(self.pages):
             if messagebox.askyesno("Confirm Delete", "Delete selected page?"):
-                self.pages.pop(self.selected_page)
+                self.pages.delete(self.selected_page)
                 self.selected_page = None
                 self.refresh_thumbnails()
         else:
             messagebox.showwarning("Warning", "Please select a page to delete.")
     
+    def undo(self, event=None):
+        """Revert the last reorder, insert or delete"""
+        if self.pages.can_undo:
+            self.selected_page = self.pages.undo()
+            self.refresh_thumbnails()
+    
+    def redo(self, event=None):
+        """Apply the last undone edit again"""
+        if self.pages.can_redo:
+            self.selected_page = self.pages.redo()
+            self.refresh_thumbnails()
+    
     def save_pdf(self):
-        """Save the edited PDF"""
+        """Save the edited PDF in the background"""
         if not self.pages:
             messagebox.showwarning("Warning", "No pages to save.")
             return
         
+        if self.save_job is not None:
+            messagebox.showinfo("Saving", "A save is already in progress.")
+            return
+        
         output_path = filedialog.asksaveasfilename(
             defaultextension=".pdf",
             filetypes=[("PDF files", "*.pdf")],
@@ -859,111 +1267,59 @@ class PDFPageEditor:
         )
         
         if output_path:
-            try:
-                # First, close all PyMuPDF documents to release file locks
-                opened_docs = {}
-                for page_data in self.pages:
-                    if page_data['type'] == 'pdf' and 'doc' in page_data:
-                        pdf_path = page_data['pdf_path']
-                        if pdf_path not in opened_docs:
-                            opened_docs[pdf_path] = page_data['doc']
-                
-                # Close all documents
-                for doc in opened_docs.values():
-                    try:
-                        doc.close()
-                    except:
-                        pass
-                
-                # Now create new PDF using PyPDF2
-                writer = PdfWriter()
-                temp_files = []
-                
-                for page_data in self.pages:
-                    if page_data['type'] == 'pdf':
-                        # Open PDF with PyPDF2 (files are now closed from PyMuPDF)
-                        reader = PdfReader(page_data['pdf_path'])
-                        writer.add_page(reader.pages[page_data['page_num']])
-                    elif page_data['type'] == 'image':
-                        # Convert image to PDF page and add
-                        img = Image.open(page_data['image_path'])
-                        
-                        # Create temporary PDF from image
-                        temp_pdf = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
-                        temp_pdf_path = temp_pdf.name
-                        temp_pdf.close()
-                        temp_files.append(temp_pdf_path)
-                        
-                        # Save image as PDF
-                        img_rgb = img.convert('RGB')
-                        img_rgb.save(temp_pdf_path, 'PDF')
-                        
-                        # Read the temporary PDF and add its page
-                        temp_reader = PdfReader(temp_pdf_path)
-                        writer.add_page(temp_reader.pages[0])
-                
-                # Write the final PDF
-                with open(output_path, 'wb') as output_file:
-                    writer.write(output_file)
-                
-                # Clean up temporary files
-                for temp_file in temp_files:
-                    try:
-                        os.unlink(temp_file)
-                    except:
-                        pass
-                
-                # Reopen PyMuPDF documents for continued editing (if user wants to stay)
-                for pdf_path, doc in opened_docs.items():
-                    try:
-                        new_doc = fitz.open(pdf_path)
-                        # Update all page_data references to use the new document
-                        for page_data in self.pages:
-                            if page_data['type'] == 'pdf' and page_data['pdf_path'] == pdf_path:
-                                page_data['doc'] = new_doc
-                    except:
-                        pass
-                
-                messagebox.showinfo("Success", f"PDF saved successfully!\nSaved to: {output_path}")
+            # The editor holds no open documents, so the output may replace one of its sources.
+            # The save itself runs as a job and is traced by assemble_pages.
+            with span("PDFPageEditor.describe_pages", pages=len(self.pages)):
+                pages = self.pages.describe()
+            
+            def on_progress(job):
+                self.status_label.config(text=f"{job.message or 'Saving'}... {int(job.progress * 100)}%")
+            
+            def on_done(job, result):
+                self.save_job = None
+                message = f"PDF saved successfully!\nSaved to: {result}"
+                if (self.optimize != "none" or self.linearize) and job.message:
+                    message += f"\n\n{job.message}"
+                messagebox.showinfo("Success", message)
                 self.close_editor()
-                
-            except Exception as e:
-                # Clean up temp files on error
-                for temp_file in temp_files:
-                    try:
-                        os.unlink(temp_file)
-                    except:
-                        pass
-                
-                # Try to reopen documents even on error
-                for pdf_path in opened_docs.keys():
-                    try:
-                        new_doc = fitz.open(pdf_path)
-                        for page_data in self.pages:
-                            if page_data['type'] == 'pdf' and page_data['pdf_path'] == pdf_path:
-                                page_data['doc'] = new_doc
-                    except:
-                        pass
-                
-                messagebox.showerror("Error", f"Failed to save PDF: {str(e)}")
+            
+            def on_error(job, error):
+                self.save_job = None
+                self.status_label.config(text="")
+                messagebox.showerror("Error", f"Failed to save PDF: {str(error)}")
+            
+            def on_cancel(job):
+                self.save_job = None
+                self.status_label.config(text="Save cancelled")
+            
+            self.status_label.config(text="Saving...")
+            self.save_job = self.jobs.submit(
+                "Saving edited PDF", pdf_core.assemble_pages, pages, output_path, optimize=self.optimize,
+                linearize=self.linearize, output_path=output_path, on_progress=on_progress,
+                on_done=on_done, on_error=on_error, on_cancel=on_cancel,
+            )
     
     def close_editor(self):
         """Close the editor window"""
-        # Close any open PDF documents
-        for page_data in self.pages:
-            if page_data['type'] == 'pdf' and 'doc' in page_data:
-                try:
-                    page_data['doc'].close()
-                except:
-                    pass
+        # Stop a save that is still running
+        if self.save_job is not None:
+            self.save_job.detach()
+            self.save_job.cancel()
+            self.save_job = None
+        
+        # Drop outstanding thumbnail renders
+        if self.renderer is not None:
+            self.renderer.shutdown()
         
         self.window.destroy()
 
 
 class PDFSignerApp:
-    def __init__(self, parent, pdf_path):
+    def __init__(self, parent, pdf_path, jobs=None):
         self.parent = parent
         self.pdf_path = pdf_path
+        self.jobs = jobs if jobs is not None else JobExecutor(parent)
+        self.save_job = None
         self.image_path = None
         self.pdf_doc = None
         self.current_page = 0
@@ -973,6 +1329,19 @@ class PDFSignerApp:
         self.dragging = False
         self.signatures = {}  # Store signatures per page: {page_num: rect}
         
+        # Rendered pages keyed by (page, zoom); neighbours are rendered ahead in a worker
+        self.page_cache = RenderCache(SIGNER_CACHE_BYTES)
+        self.prefetcher = JobExecutor(parent, max_workers=1)
+        self.prefetch_job = None
+        self.prefetching = set()
+        
+        # Zoomed-in views are drawn from tiles; only tiles in view are rendered
+        self.zoom_level = 1.0  # Relative to fit-to-window
+        self.tile_cache = RenderCache(TILE_CACHE_BYTES)
+        self.tile_items = {}  # (column, row) -> (canvas item, PhotoImage)
+        self.display_list = None  # (page_num, fitz.DisplayList) of the zoomed page
+        self.tiles_pending = False
+        
         # Create signer window
         self.window = tk.Toplevel(parent)
         self.window.title("PDF Signature Tool")
@@ -988,6 +1357,9 @@ class PDFSignerApp:
         # Display first page
         self.display_page()
         
+        # The title bar's close button must also stop the prefetcher and any save
+        self.window.protocol("WM_DELETE_WINDOW", self.close_signer)
+        
         # Make window modal
         self.window.transient(parent)
         self.window.grab_set()
@@ -1010,6 +1382,13 @@ class PDFSignerApp:
         ttk.Button(top_frame, text="Previous", command=self.prev_page).pack(side=tk.LEFT, padx=5)
         ttk.Button(top_frame, text="Next", command=self.next_page).pack(side=tk.LEFT, padx=5)
         
+        # Zoom controls
+        ttk.Button(top_frame, text="Zoom Out", command=lambda: self.set_zoom(self.zoom_level / ZOOM_STEP)).pack(side=tk.LEFT, padx=(20, 5))
+        ttk.Button(top_frame, text="Fit", command=lambda: self.set_zoom(1.0)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(top_frame, text="Zoom In", command=lambda: self.set_zoom(self.zoom_level * ZOOM_STEP)).pack(side=tk.LEFT, padx=5)
+        self.zoom_label = tk.Label(top_frame, text="", font=("Segoe UI", 9), bg="#f0f0f0")
+        self.zoom_label.pack(side=tk.LEFT, padx=5)
+        
         # Canvas frame with scrollbars
         canvas_frame = tk.Frame(self.window)
         canvas_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -1019,7 +1398,16 @@ class PDFSignerApp:
         v_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=self.canvas.yview)
         h_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
         
-        self.canvas.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        # Render newly exposed tiles whenever the view moves
+        def on_yscroll(first, last):
+            v_scrollbar.set(first, last)
+            self.schedule_tiles()
+        
+        def on_xscroll(first, last):
+            h_scrollbar.set(first, last)
+            self.schedule_tiles()
+        
+        self.canvas.configure(yscrollcommand=on_yscroll, xscrollcommand=on_xscroll)
         
         v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
@@ -1030,6 +1418,10 @@ class PDFSignerApp:
         self.canvas.bind("<B1-Motion>", self.on_mouse_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_mouse_up)
         
+        # Scroll with the mouse wheel, zoom with Ctrl+wheel
+        self.canvas.bind("<MouseWheel>", self.on_mousewheel)
+        self.canvas.bind("<Configure>", lambda e: self.schedule_tiles())
+        
         # Status label
         self.status_label = tk.Label(self.window, text="No signatures added yet", 
                                      bg="#e0e0e0", pady=5, font=("Segoe UI", 9))
@@ -1050,36 +1442,30 @@ class PDFSignerApp:
             self.image_path = file_path
             messagebox.showinfo("Success", "Signature loaded! Click and drag on the PDF to place it.")
     
+    @traced("PDFSignerApp.display_page")
     def display_page(self):
         if not self.pdf_doc:
             return
         
-        page = self.pdf_doc[self.current_page]
-        
-        # Get canvas dimensions
-        canvas_width = self.canvas.winfo_width()
-        canvas_height = self.canvas.winfo_height()
-        if canvas_width <= 1:
-            canvas_width = 1000
-        if canvas_height <= 1:
-            canvas_height = 700
-        
-        # Calculate zoom to fit
-        page_rect = page.rect
-        zoom_w = (canvas_width - 40) / page_rect.width
-        zoom_h = (canvas_height - 40) / page_rect.height
-        zoom_factor = min(zoom_w, zoom_h)
-        
-        # Render page
-        pix = page.get_pixmap(matrix=fitz.Matrix(zoom_factor, zoom_factor))
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-        
-        self.pdf_image = ImageTk.PhotoImage(img)
+        page_rect = self.pdf_doc[self.current_page].rect
+        zoom_factor = self.fit_zoom(self.current_page)
+        if self.zoom_level != 1.0:
+            zoom_factor = round(zoom_factor * self.zoom_level, 4)
         self.zoom_factor = zoom_factor
         
         self.canvas.delete("all")
-        self.canvas.create_image(20, 20, anchor=tk.NW, image=self.pdf_image)
-        self.canvas.config(scrollregion=self.canvas.bbox(tk.ALL))
+        self.tile_items = {}
+        if self.zoom_level == 1.0:
+            # The whole page fits the window: show it as one (possibly prefetched) image
+            self.display_list = None
+            self.pdf_image = ImageTk.PhotoImage(self.page_image(self.current_page, zoom_factor))
+            self.canvas.create_image(20, 20, anchor=tk.NW, image=self.pdf_image)
+        else:
+            self.pdf_image = None
+            self.schedule_tiles()
+        self.canvas.config(scrollregion=(0, 0, page_rect.width * zoom_factor + 40,
+                                         page_rect.height * zoom_factor + 40))
+        self.zoom_label.config(text=f"Zoom: {zoom_factor:.0%}")
         
         self.page_label.config(text=f"Page: {self.current_page + 1}/{len(self.pdf_doc)}")
         
@@ -1096,6 +1482,157 @@ class PDFSignerApp:
                                    fill="blue", font=("Arial", 12, "bold"), tags="saved_signature")
         
         self.update_status()
+        self.prefetch_neighbours()
+    
+    def fit_zoom(self, page_num):
+        """Zoom that fits a page into the canvas"""
+        # Get canvas dimensions
+        canvas_width = self.canvas.winfo_width()
+        canvas_height = self.canvas.winfo_height()
+        if canvas_width <= 1:
+            canvas_width = 1000
+        if canvas_height <= 1:
+            canvas_height = 700
+        
+        # Calculate zoom to fit
+        page_rect = self.pdf_doc[page_num].rect
+        zoom_w = (canvas_width - 40) / page_rect.width
+        zoom_h = (canvas_height - 40) / page_rect.height
+        return round(min(zoom_w, zoom_h), 4)
+    
+    def page_image(self, page_num, zoom):
+        """Rendered page from the cache, or rendered now on a miss"""
+        img = self.page_cache.get((page_num, zoom))
+        if img is None:
+            img = render_page(self.pdf_doc[page_num], zoom)
+            self.page_cache.put((page_num, zoom), img)
+        return img
+    
+    def prefetch_neighbours(self):
+        """Render the pages around the current one in the background"""
+        if self.zoom_level != 1.0:
+            return  # Zoomed views are tiled; whole-page previews would go unused
+        
+        wanted = []
+        for offset in PREFETCH_OFFSETS:
+            page_num = self.current_page + offset
+            if 0 <= page_num < len(self.pdf_doc):
+                wanted.append((page_num, self.fit_zoom(page_num)))
+        
+        # A job whose pages the user has moved away from is no longer worth finishing
+        if self.prefetch_job is not None and self.prefetching.isdisjoint(wanted):
+            self.prefetch_job.cancel()
+            self.prefetch_job = None
+        
+        requests = [key for key in wanted if key not in self.page_cache and key not in self.prefetching]
+        if not requests:
+            return
+        
+        def on_done(job, results):
+            for page_num, zoom, size, data in results:
+                self.page_cache.put((page_num, zoom), Image.frombytes("RGB", size, data))
+            finish(job)
+        
+        def finish(job, error=None):
+            if error is not None:
+                print(f"Error prefetching pages: {error}")
+            self.prefetching.difference_update(requests)
+            if self.prefetch_job is job:
+                self.prefetch_job = None
+        
+        self.prefetching.update(requests)
+        self.prefetch_job = self.prefetcher.submit(
+            "Prefetching pages", render_page_batch, self.pdf_path, requests,
+            on_done=on_done, on_error=finish, on_cancel=finish,
+        )
+    
+    def page_display_list(self, page_num):
+        """Display list of a page, kept for the current page so tiles skip re-parsing it"""
+        if self.display_list is None or self.display_list[0] != page_num:
+            self.display_list = (page_num, self.pdf_doc[page_num].get_displaylist())
+        return self.display_list[1]
+    
+    def schedule_tiles(self):
+        """Coalesce scroll and resize events into one tile update when Tk is idle"""
+        if self.zoom_level != 1.0 and not self.tiles_pending:
+            self.tiles_pending = True
+            self.window.after_idle(self.update_tiles)
+    
+    @traced("PDFSignerApp.update_tiles")
+    def update_tiles(self):
+        """Show the tiles of the zoomed page that are in view, rendering missing ones"""
+        self.tiles_pending = False
+        if not self.pdf_doc or self.zoom_level == 1.0:
+            return
+        
+        zoom = self.zoom_factor
+        page_rect = self.pdf_doc[self.current_page].rect
+        columns = math.ceil(page_rect.width * zoom / TILE_SIZE)
+        rows = math.ceil(page_rect.height * zoom / TILE_SIZE)
+        
+        # Visible part of the page in zoomed page pixels (the page sits at a 20 px offset)
+        left = self.canvas.canvasx(0) - 20
+        top = self.canvas.canvasy(0) - 20
+        right = left + self.canvas.winfo_width()
+        bottom = top + self.canvas.winfo_height()
+        visible = {
+            (column, row)
+            for column in range(max(0, int(left // TILE_SIZE)), min(columns, int(right // TILE_SIZE) + 1))
+            for row in range(max(0, int(top // TILE_SIZE)), min(rows, int(bottom // TILE_SIZE) + 1))
+        }
+        
+        # Drop tiles that scrolled out of view; they stay in the tile cache
+        for key in [key for key in self.tile_items if key not in visible]:
+            self.canvas.delete(self.tile_items.pop(key)[0])
+        
+        for column, row in sorted(visible):
+            if (column, row) in self.tile_items:
+                continue
+            cache_key = (self.current_page, zoom, column, row)
+            img = self.tile_cache.get(cache_key)
+            if img is None:
+                img = render_tile(self.page_display_list(self.current_page), zoom, column, row)
+                self.tile_cache.put(cache_key, img)
+            photo = ImageTk.PhotoImage(img)
+            item = self.canvas.create_image(20 + column * TILE_SIZE, 20 + row * TILE_SIZE,
+                                            anchor=tk.NW, image=photo, tags="page_tile")
+            self.tile_items[(column, row)] = (item, photo)
+        
+        # Keep signature boxes above the page
+        self.canvas.tag_lower("page_tile")
+    
+    def set_zoom(self, level, anchor=None):
+        """Zoom relative to fit-to-window, keeping the point under ``anchor`` in place"""
+        level = min(MAX_ZOOM_LEVEL, max(1.0, level))
+        if abs(level - 1.0) < 0.01:
+            level = 1.0
+        if not self.pdf_doc or level == self.zoom_level:
+            return
+        
+        # Page position under the anchor (default: the middle of the view)
+        if anchor is None:
+            anchor = (self.canvas.winfo_width() / 2, self.canvas.winfo_height() / 2)
+        old_zoom = self.zoom_factor
+        page_x = (self.canvas.canvasx(anchor[0]) - 20) / old_zoom
+        page_y = (self.canvas.canvasy(anchor[1]) - 20) / old_zoom
+        
+        self.zoom_level = level
+        self.display_page()
+        
+        # Scroll so the same page position is back under the anchor
+        page_rect = self.pdf_doc[self.current_page].rect
+        total_width = page_rect.width * self.zoom_factor + 40
+        total_height = page_rect.height * self.zoom_factor + 40
+        self.canvas.xview_moveto((page_x * self.zoom_factor + 20 - anchor[0]) / total_width)
+        self.canvas.yview_moveto((page_y * self.zoom_factor + 20 - anchor[1]) / total_height)
+    
+    def on_mousewheel(self, event):
+        """Scroll the page, or zoom around the pointer with Ctrl held"""
+        if event.state & 0x4:
+            factor = ZOOM_STEP if event.delta > 0 else 1 / ZOOM_STEP
+            self.set_zoom(self.zoom_level * factor, (event.x, event.y))
+        else:
+            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
     
     def prev_page(self):
         if self.pdf_doc and self.current_page > 0:
@@ -1113,15 +1650,15 @@ class PDFSignerApp:
             return
         
         self.dragging = True
-        self.sig_start_x = event.x
-        self.sig_start_y = event.y
+        self.sig_start_x = self.canvas.canvasx(event.x)
+        self.sig_start_y = self.canvas.canvasy(event.y)
     
     def on_mouse_drag(self, event):
         if self.dragging and self.image_path:
             self.canvas.delete("signature_preview")
             self.canvas.create_rectangle(
                 self.sig_start_x, self.sig_start_y,
-                event.x, event.y,
+                self.canvas.canvasx(event.x), self.canvas.canvasy(event.y),
                 outline="red", width=2, tags="signature_preview"
             )
     
@@ -1132,11 +1669,13 @@ class PDFSignerApp:
         self.dragging = False
         
         if self.sig_start_x and self.sig_start_y:
-            # Calculate final rectangle
-            x1 = min(self.sig_start_x, event.x)
-            y1 = min(self.sig_start_y, event.y)
-            x2 = max(self.sig_start_x, event.x)
-            y2 = max(self.sig_start_y, event.y)
+            # Calculate final rectangle in canvas coordinates
+            x = self.canvas.canvasx(event.x)
+            y = self.canvas.canvasy(event.y)
+            x1 = min(self.sig_start_x, x)
+            y1 = min(self.sig_start_y, y)
+            x2 = max(self.sig_start_x, x)
+            y2 = max(self.sig_start_y, y)
             
             # Draw final preview
             self.canvas.delete("signature_preview")
@@ -1197,6 +1736,10 @@ class PDFSignerApp:
             messagebox.showwarning("Warning", "Please add at least one signature to a page first!")
             return
         
+        if self.save_job is not None:
+            messagebox.showinfo("Saving", "A save is already in progress.")
+            return
+        
         output_path = filedialog.asksaveasfilename(
             defaultextension=".pdf",
             filetypes=[("PDF files", "*.pdf")],
@@ -1205,27 +1748,38 @@ class PDFSignerApp:
         )
         
         if output_path:
-            try:
-                # Create a copy of the PDF
-                output_doc = fitz.open(self.pdf_path)
-                
-                # Apply all signatures
-                for page_num, rect in self.signatures.items():
-                    page = output_doc[page_num]
-                    page.insert_image(fitz.Rect(rect), filename=self.image_path)
-                
-                # Save the signed PDF
-                output_doc.save(output_path)
-                output_doc.close()
-                
-                pages_signed = ', '.join([str(p + 1) for p in sorted(self.signatures.keys())])
-                messagebox.showinfo("Success", f"PDF saved with signatures on pages: {pages_signed}\n\nSaved as: {output_path}")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to save signed PDF: {str(e)}")
+            def on_progress(job):
+                self.status_label.config(text=f"{job.message or 'Saving'}... {int(job.progress * 100)}%")
+            
+            def on_done(job, result):
+                self.save_job = None
+                self.update_status()
+                pages_signed = ', '.join([str(p + 1) for p in sorted(signatures.keys())])
+                messagebox.showinfo("Success", f"PDF saved with signatures on pages: {pages_signed}\n\nSaved as: {result}")
+            
+            def on_error(job, error):
+                self.save_job = None
+                self.update_status()
+                messagebox.showerror("Error", f"Failed to save signed PDF: {str(error)}")
+            
+            def on_cancel(job):
+                self.save_job = None
+                self.update_status()
+            
+            signatures = dict(self.signatures)
+            self.save_job = self.jobs.submit(
+                "Saving signed PDF", pdf_core.sign_pdf, self.pdf_path, self.image_path, signatures, output_path,
+                output_path=output_path, on_progress=on_progress,
+                on_done=on_done, on_error=on_error, on_cancel=on_cancel,
+            )
     
     def close_signer(self):
         """Close the signer window"""
+        if self.save_job is not None:
+            self.save_job.detach()
+            self.save_job.cancel()
+            self.save_job = None
+        self.prefetcher.shutdown()
         if self.pdf_doc:
             try:
                 self.pdf_doc.close()
@@ -1235,8 +1789,27 @@ class PDFSignerApp:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="PDF Wizard")
+    parser.add_argument("--trace", metavar="FILE", help="append timing spans to FILE as JSON lines")
+    parser.add_argument("--profile", metavar="MODE",
+                        help="profile each operation: cprofile, tracemalloc or both (comma-separated)")
+    parser.add_argument("--editor-memory", type=pdf_core.parse_size, metavar="SIZE",
+                        help=f"thumbnail memory per page editor, e.g. 512M (default: "
+                             f"{DEFAULT_EDITOR_MEMORY // 2**20}M)")
+    parser.add_argument("--render-workers", type=int, metavar="N",
+                        help=f"thumbnail render processes per page editor; 0 renders inline "
+                             f"(default: {DEFAULT_RENDER_WORKERS})")
+    parser.add_argument("--optimize", choices=list(OPTIMIZE_LEVELS), default=DEFAULT_OPTIMIZE_LEVEL,
+                        help="initial size optimization for merged and edited PDFs (default: none)")
+    parser.add_argument("--linearize", action="store_true",
+                        help="start with fast web view (linearized output) turned on")
+    args, _ = parser.parse_known_args()
+    if args.trace or args.profile:
+        configure_tracing(args.trace, args.profile)
+
     root = tk.Tk()
-    app = PDFToolApp(root)
+    app = PDFToolApp(root, editor_memory=args.editor_memory, optimize=args.optimize, linearize=args.linearize,
+                     render_workers=args.render_workers)
     # Minimize the console window after creating the Tkinter window
     app.minimize_console()
     root.mainloop()
@@ -0,0 +1,277 @@
+"""Background job executor for long-running PDF operations.
+
+Work is submitted to a process pool (or a thread pool when processes are
+disabled) so the Tk main loop never blocks. Workers report progress through a
+shared queue that the UI drains with ``root.after``; cancellation is
+cooperative through a shared event that workers check between steps.
+"""
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from pdf_trace import emit
+
+# Suffix of the temporary file a job writes before it is moved into place
+PART_SUFFIX = ".part"
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job has been cancelled"""
+
+
+def partial_path(output_path):
+    """Return the temporary path a job writes to before committing its output"""
+    return output_path + PART_SUFFIX
+
+
+def commit_output(output_path):
+    """Move a finished partial output into its final location"""
+    os.replace(partial_path(output_path), output_path)
+
+
+def discard_partial(output_path):
+    """Delete a partial output left behind by a failed or cancelled job.
+
+    A missing file is fine; any other OSError is raised.
+    """
+    try:
+        os.unlink(partial_path(output_path))
+    except FileNotFoundError:
+        pass
+
+
+def remove_partial(output_path):
+    """discard_partial for error paths: a file that cannot be removed is only reported"""
+    try:
+        discard_partial(output_path)
+    except OSError as e:
+        print(f"Could not remove partial output {output_path}: {e}")
+
+
+class JobContext:
+    """Worker-side handle passed as the ``ctx`` keyword to every job function"""
+
+    def __init__(self, job_id, events, cancel_event):
+        self.job_id = job_id
+        self._events = events
+        self._cancel_event = cancel_event
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Raise JobCancelled if the job has been asked to stop"""
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def report(self, fraction, message=None):
+        """Send a progress update (0.0 - 1.0) back to the UI"""
+        self._events.put((self.job_id, max(0.0, min(1.0, fraction)), message))
+
+
+class NullContext:
+    """Stand-in context for calls made outside the executor"""
+
+    cancelled = False
+
+    def check_cancelled(self):
+        pass
+
+    def report(self, fraction, message=None):
+        pass
+
+
+class Job:
+    """UI-side handle for a submitted job"""
+
+    def __init__(self, job_id, name, output_path, cancel_event):
+        self.id = job_id
+        self.name = name
+        self.output_path = output_path
+        self.progress = 0.0
+        self.message = None
+        self.future = None
+        self.callbacks = {}
+        self.submitted = time.time()
+        self._cancel_event = cancel_event
+
+    @property
+    def cancel_requested(self):
+        return self._cancel_event.is_set()
+
+    def detach(self):
+        """Drop the UI callbacks, e.g. when the window that owns the job closes"""
+        self.callbacks = {}
+
+    def cancel(self):
+        """Request cancellation; a job that has not started yet is dropped"""
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class JobExecutor:
+    """Run PDF jobs off the Tk main thread and dispatch their callbacks on it"""
+
+    def __init__(self, root, max_workers=None, use_processes=True, poll_interval=100):
+        self.root = root
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.use_processes = use_processes
+        self.poll_interval = poll_interval
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._pool = None
+        self._manager = None
+        self._events = None
+        self._poll_id = None
+
+    def _ensure_pool(self):
+        """Start the worker pool lazily so opening the app stays fast"""
+        if self._pool is not None:
+            return
+        if self.use_processes:
+            self._manager = multiprocessing.Manager()
+            self._events = self._manager.Queue()
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        else:
+            self._events = queue.Queue()
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="pdf-job")
+
+    def _new_event(self):
+        if self.use_processes:
+            return self._manager.Event()
+        return threading.Event()
+
+    def submit(self, name, func, *args, output_path=None, on_progress=None,
+               on_done=None, on_error=None, on_cancel=None, **kwargs):
+        """Submit ``func(*args, ctx=ctx, **kwargs)`` and return its Job handle.
+
+        ``func`` must be a module-level function when processes are used.
+        Callbacks are always invoked on the Tk main thread.
+        """
+        self._ensure_pool()
+        job_id = next(self._ids)
+        cancel_event = self._new_event()
+        job = Job(job_id, name, output_path, cancel_event)
+        job.callbacks = {
+            "progress": on_progress,
+            "done": on_done,
+            "error": on_error,
+            "cancel": on_cancel,
+        }
+        ctx = JobContext(job_id, self._events, cancel_event)
+        job.future = self._pool.submit(func, *args, ctx=ctx, **kwargs)
+        self.jobs[job_id] = job
+        self._schedule_poll()
+        return job
+
+    @property
+    def running(self):
+        return list(self.jobs.values())
+
+    def overall_progress(self):
+        """Average progress over all active jobs (0.0 - 1.0)"""
+        if not self.jobs:
+            return 0.0
+        return sum(job.progress for job in self.jobs.values()) / len(self.jobs)
+
+    def cancel_all(self):
+        for job in list(self.jobs.values()):
+            job.cancel()
+
+    def shutdown(self):
+        """Cancel outstanding work and stop the pool"""
+        self.cancel_all()
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        for job in self.jobs.values():
+            if job.output_path:
+                remove_partial(job.output_path)
+        self.jobs.clear()
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def _schedule_poll(self):
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """Drain progress events and finish completed jobs (main thread only)"""
+        self._poll_id = None
+
+        # Jobs finished before draining have had all their progress events queued
+        finished = [job for job in self.jobs.values() if job.future.done()]
+        while True:
+            try:
+                job_id, fraction, message = self._events.get_nowait()
+            except (queue.Empty, EOFError, OSError):
+                break
+            job = self.jobs.get(job_id)
+            if job is None:
+                continue
+            job.progress = fraction
+            job.message = message
+            self._call(job, "progress", job)
+
+        for job in finished:
+            del self.jobs[job.id]
+            self._finish(job)
+
+        if self.jobs:
+            self._schedule_poll()
+
+    def _finish(self, job):
+        error = None if job.future.cancelled() else job.future.exception()
+        if job.future.cancelled() or isinstance(error, JobCancelled):
+            status = "cancelled"
+        else:
+            status = "failed" if error is not None else "done"
+        # Submission to completion, as the user experiences it (queueing included)
+        emit("job", job.submitted, time.time() - job.submitted, job=job.name, status=status)
+
+        if status == "done":
+            job.progress = 1.0
+            self._call(job, "done", job, job.future.result())
+            return
+
+        cleanup_error = self._discard_partial(job)
+        if status == "cancelled":
+            self._call(job, "cancel", job)
+            if cleanup_error is not None:
+                self._call(job, "error", job, cleanup_error)
+        else:
+            if cleanup_error is not None:
+                # Report both: the job's failure and the file it left behind
+                error = OSError(f"{error}; {cleanup_error}")
+            self._call(job, "error", job, error)
+
+    def _discard_partial(self, job):
+        """Delete any partially written output left behind by a job; returns the error if that failed"""
+        if job.output_path:
+            try:
+                discard_partial(job.output_path)
+            except OSError as e:
+                return OSError(f"Could not remove partial output {job.output_path}: {e}")
+        return None
+
+    def _call(self, job, kind, *args):
+        callback = job.callbacks.get(kind)
+        if callback is not None:
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error in {kind} callback for job '{job.name}': {e}")
@@ -0,0 +1,248 @@
+"""Size optimization and linearization pass for finished PDFs.
+
+Merges and editor saves copy each input's resources separately, so a logo
+or font shared by every input ends up once per input in the output.
+``optimize_pdf`` rewrites a file at one of these levels:
+
+- ``none``: leave the file as written.
+- ``light``: drop unreferenced objects and compress uncompressed streams.
+- ``standard``: also merge identical objects and streams across inputs.
+  This is where repeated logos, fonts and images collapse into one copy.
+- ``max``: also recompress image and font streams, and pack objects into
+  object streams when the installed PyMuPDF can write them (1.24+).
+
+The same pass can linearize the output ("fast web view"): the first page
+and everything it needs come first, with hint tables, so a viewer loading
+the file over HTTP can show page 1 before the rest has arrived.
+``linearization_problems`` checks the result.
+
+The pass loads the whole output, so for merges run in streaming mode it
+gives up the bounded memory of the merge itself.
+
+Command line usage::
+
+    python -m pdf_optimize in.pdf -o out.pdf --level standard
+    python -m pdf_optimize in.pdf -o web.pdf --level none --linearize
+    python -m pdf_optimize --check web.pdf
+"""
+import argparse
+import inspect
+import os
+import re
+import shutil
+import sys
+import time
+
+import fitz  # PyMuPDF
+
+from pdf_jobs import NullContext
+from pdf_trace import span, traced
+
+# Level name -> Document.save options
+OPTIMIZE_LEVELS = {
+    "none": None,
+    "light": {"garbage": 1, "deflate": True},
+    "standard": {"garbage": 4, "deflate": True},
+    "max": {"garbage": 4, "deflate": True, "deflate_images": True, "deflate_fonts": True},
+}
+DEFAULT_OPTIMIZE_LEVEL = "none"
+
+SAVE_PARAMETERS = inspect.signature(fitz.Document.save).parameters
+
+# Object streams need a PyMuPDF whose save() takes use_objstms
+OBJECT_STREAMS = "use_objstms" in SAVE_PARAMETERS
+if OBJECT_STREAMS:
+    OPTIMIZE_LEVELS["max"]["use_objstms"] = True
+
+# MuPDF dropped linearized writing in later releases; the check below catches
+# versions that still take the option but ignore it
+LINEARIZE = "linear" in SAVE_PARAMETERS
+
+# The linearization dictionary must start within this many bytes of the file
+LINEARIZED_HEADER_BYTES = 1024
+LINEARIZED_DICT = re.compile(rb"\d+\s+\d+\s+obj\s*<<(.*?/Linearized.*?)>>", re.S)
+
+
+def save_options(level):
+    """Document.save options for an optimization level"""
+    if level not in OPTIMIZE_LEVELS:
+        raise ValueError(f"Unknown optimization level {level!r}; use one of {', '.join(OPTIMIZE_LEVELS)}")
+    return OPTIMIZE_LEVELS[level]
+
+
+@traced("optimize_pdf")
+def optimize_pdf(input_path, output_path=None, level="standard", ctx=None, linearize=False):
+    """Rewrite input_path at an optimization level; output_path defaults to in place.
+
+    Returns a dict with the level, whether the output is linearized, the
+    size before and after, and the seconds spent. If an unlinearized rewrite
+    comes out larger, the original bytes are kept and "after" equals
+    "before". With ``linearize`` the output is always rewritten and checked
+    with linearization_problems; RuntimeError is raised if the check fails.
+    """
+    ctx = ctx or NullContext()
+    output_path = output_path or input_path
+    options = save_options(level)
+    start = time.perf_counter()
+    before = os.path.getsize(input_path)
+    result = {"level": level, "linearized": False, "before": before, "after": before, "seconds": 0.0}
+
+    if options is None and not linearize:
+        if output_path != input_path:
+            shutil.copyfile(input_path, output_path)
+        return result
+
+    options = dict(options or {})
+    if linearize:
+        if not LINEARIZE:
+            raise RuntimeError(f"PyMuPDF {fitz.VersionBind} cannot write linearized PDFs")
+        options["linear"] = True
+    ctx.check_cancelled()
+    ctx.report(1.0, "Linearizing" if linearize and level == "none" else f"Optimizing ({level})")
+    temp_path = output_path + ".opt"
+    try:
+        with span("optimize.write", level=level, linearize=linearize), fitz.open(input_path) as doc:
+            doc.save(temp_path, **options)
+        ctx.check_cancelled()
+        if linearize:
+            fix_first_page_object(temp_path)
+            problems = linearization_problems(temp_path)
+            if problems:
+                raise RuntimeError("Linearized output failed validation: " + "; ".join(problems))
+            result["linearized"] = True
+        if linearize or os.path.getsize(temp_path) < before:
+            os.replace(temp_path, output_path)
+            result["after"] = os.path.getsize(output_path)
+        else:
+            os.remove(temp_path)
+            if output_path != input_path:
+                shutil.copyfile(input_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def savings_line(result):
+    """One-line summary of an optimize_pdf result"""
+    saved = result["before"] - result["after"]
+    percent = saved / result["before"] if result["before"] else 0.0
+    action = f"Optimized ({result['level']})"
+    if result.get("linearized"):
+        action = "Linearized" if result["level"] == "none" else action + " and linearized"
+    return (f"{action}: {result['before'] / 1e6:.2f} MB -> {result['after'] / 1e6:.2f} MB, "
+            f"saved {saved / 1e6:.2f} MB ({percent:.0%}) in {result['seconds']:.2f}s")
+
+
+def linearization_parameters(path):
+    """The linearization dictionary at the start of path as {key: value}, or None"""
+    with open(path, "rb") as f:
+        head = f.read(LINEARIZED_HEADER_BYTES + 256)
+    match = LINEARIZED_DICT.search(head)
+    if match is None or match.start() >= LINEARIZED_HEADER_BYTES:
+        return None
+    params = {}
+    for key, value in re.findall(rb"/(\w+)\s*(\[[^\]]*\]|[\d.]+)", match.group(1)):
+        numbers = [int(float(n)) for n in re.findall(rb"[\d.]+", value)]
+        params[key.decode()] = numbers if value.startswith(b"[") else numbers[0]
+    return params
+
+
+def fix_first_page_object(path):
+    """Correct the first-page object number (/O) of a linearized file in place.
+
+    MuPDF 1.23 writes the number of a neighbouring object there, while its
+    hint tables point at the right page object. Viewers use /O to show page
+    1 early, so it is rewritten to the real page object. The dictionary is
+    followed by padding, so the file length and every offset stay the same.
+    Returns True if the file was changed.
+    """
+    params = linearization_parameters(path)
+    if params is None:
+        return False
+    with fitz.open(path) as doc:
+        if not len(doc) or params.get("O") == doc[0].xref:
+            return False
+        page_xref = doc[0].xref
+    with open(path, "r+b") as f:
+        head = f.read(LINEARIZED_HEADER_BYTES + 256)
+        match = LINEARIZED_DICT.search(head)
+        end = re.compile(rb">>\s*endobj\s*").match(head, match.end(1))
+        if end is None:
+            return False
+        entries = re.sub(rb"/O\s+\d+", b"/O %d" % page_xref, match.group(1))
+        replacement = entries + b">>\nendobj\n"
+        space = end.end() - match.start(1)
+        if len(replacement) > space:
+            return False
+        f.seek(match.start(1))
+        f.write(replacement.ljust(space, b"\n"))
+    return True
+
+
+def linearization_problems(path):
+    """Reasons path is not a valid linearized PDF; empty when it is.
+
+    Checks that the linearization dictionary opens the file and that its
+    file length, page count, first-page object and offsets match the file,
+    which catches truncation and later incremental updates, and that MuPDF
+    recognizes the file as linearized.
+    """
+    params = linearization_parameters(path)
+    if params is None:
+        return [f"no linearization dictionary in the first {LINEARIZED_HEADER_BYTES} bytes"]
+    problems = []
+    size = os.path.getsize(path)
+    if params.get("L") != size:
+        problems.append(f"/L is {params.get('L')} but the file has {size} bytes")
+    hint = params.get("H") or []
+    if len(hint) < 2 or hint[0] + hint[1] > size:
+        problems.append(f"hint stream /H {hint} lies outside the file")
+    for key in ("E", "T"):
+        if not 0 < params.get(key, 0) < size:
+            problems.append(f"/{key} offset {params.get(key)} lies outside the file")
+    try:
+        with fitz.open(path) as doc:
+            if params.get("N") != len(doc):
+                problems.append(f"/N is {params.get('N')} but the document has {len(doc)} pages")
+            if len(doc) and params.get("O") != doc[0].xref:
+                problems.append(f"/O is {params.get('O')} but the first page is object {doc[0].xref}")
+            if not doc.is_fast_webaccess:
+                problems.append("MuPDF does not recognize the file as linearized")
+    except Exception as e:
+        problems.append(f"cannot open: {e}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pdf_optimize",
+                                     description="Shrink a PDF by deduplicating and compressing its objects.")
+    parser.add_argument("input", help="PDF file to optimize")
+    parser.add_argument("-o", "--output", help="output PDF (default: rewrite the input)")
+    parser.add_argument("--level", choices=list(OPTIMIZE_LEVELS), default="standard",
+                        help="optimization level (default: standard)")
+    parser.add_argument("--linearize", action="store_true", help="also write a linearized (fast web view) PDF")
+    parser.add_argument("--check", action="store_true",
+                        help="only check that the input is validly linearized")
+    args = parser.parse_args(argv)
+    if args.check:
+        problems = linearization_problems(args.input)
+        for problem in problems:
+            print(f"{args.input}: {problem}")
+        if not problems:
+            print(f"{args.input}: linearized")
+        return 1 if problems else 0
+    try:
+        result = optimize_pdf(args.input, args.output, args.level, linearize=args.linearize)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(savings_line(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
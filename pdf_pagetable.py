@@ -0,0 +1,190 @@
+"""Compact page table for the page editor, with undo and redo.
+
+The editor used to keep one dict per page, each holding its source path,
+page number, an open document and a thumbnail. A PageTable keeps each
+source (kind and path) once and describes the pages with three parallel
+arrays of machine integers:
+
+- source id
+- page number within the source
+- a row id that stays with the page as it moves, so the UI can follow it
+
+A 5,000-page session then takes tens of kilobytes.
+
+Every edit (insert, delete, move) is recorded as a small operation holding
+only the rows it touched, so undo and redo cost memory proportional to the
+change rather than to a copy of the page list.
+"""
+from array import array
+from collections import namedtuple
+
+# Operations kept for undo; the oldest are dropped beyond this
+UNDO_LIMIT = 500
+
+PageRef = namedtuple("PageRef", "row type path page_num")
+PageRef.__doc__ = "One page of the table: its row id, source kind ('pdf' or 'image'), path and page number"
+
+
+class PageTable:
+    """Ordered pages from interned sources, with an undo/redo log"""
+
+    def __init__(self):
+        self.sources = []  # source id -> (type, path)
+        self._source_ids = {}
+        self._source = array("I")
+        self._page = array("i")
+        self._row = array("I")
+        self._next_row = 0
+        self._undo = []
+        self._redo = []
+
+    def __len__(self):
+        return len(self._source)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        kind, path = self.sources[self._source[index]]
+        return PageRef(self._row[index], kind, path, self._page[index])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def row_id(self, index):
+        return self._row[index]
+
+    def source_id(self, kind, path):
+        """Intern a source and return its id"""
+        key = (kind, path)
+        source_id = self._source_ids.get(key)
+        if source_id is None:
+            source_id = self._source_ids[key] = len(self.sources)
+            self.sources.append(key)
+        return source_id
+
+    def nbytes(self):
+        """Approximate memory held by the page arrays and the undo log"""
+        arrays = sum(a.itemsize * len(a) for a in (self._source, self._page, self._row))
+        log = sum(op_nbytes(op) for op in self._undo + self._redo)
+        return arrays + log
+
+    # Editing
+
+    def insert(self, index, kind, path, page_nums, record=True):
+        """Insert pages of one source before ``index``; returns the index"""
+        source_id = self.source_id(kind, path)
+        pages = array("i", page_nums)
+        sources = array("I", [source_id]) * len(pages)
+        rows = array("I", range(self._next_row, self._next_row + len(pages)))
+        self._next_row += len(pages)
+        self._apply(("insert", index, sources, pages, rows), record)
+        return index
+
+    def append(self, kind, path, page_nums, record=True):
+        return self.insert(len(self), kind, path, page_nums, record)
+
+    def delete(self, index, count=1):
+        """Remove ``count`` pages starting at ``index``"""
+        end = index + count
+        self._apply(("delete", index, self._source[index:end], self._page[index:end], self._row[index:end]))
+        return index
+
+    def move(self, source_index, target_index):
+        """Move one page so that it ends up at ``target_index``"""
+        if source_index != target_index:
+            self._apply(("move", source_index, target_index))
+        return target_index
+
+    # History
+
+    @property
+    def can_undo(self):
+        return bool(self._undo)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self):
+        """Revert the last edit; returns the index of the page it touched, or None"""
+        if not self._undo:
+            return None
+        op = self._undo.pop()
+        self._execute(inverse(op))
+        self._redo.append(op)
+        return focus_index(inverse(op), len(self))
+
+    def redo(self):
+        """Re-apply the last undone edit; returns the index of the page it touched, or None"""
+        if not self._redo:
+            return None
+        op = self._redo.pop()
+        self._execute(op)
+        self._undo.append(op)
+        return focus_index(op, len(self))
+
+    def clear_history(self):
+        self._undo.clear()
+        self._redo.clear()
+
+    def _apply(self, op, record=True):
+        self._execute(op)
+        if record:
+            self._undo.append(op)
+            del self._undo[:-UNDO_LIMIT]
+            self._redo.clear()
+
+    def _execute(self, op):
+        kind = op[0]
+        if kind == "insert":
+            _, index, sources, pages, rows = op
+            self._source[index:index] = sources
+            self._page[index:index] = pages
+            self._row[index:index] = rows
+        elif kind == "delete":
+            _, index, sources, _, _ = op
+            end = index + len(sources)
+            del self._source[index:end]
+            del self._page[index:end]
+            del self._row[index:end]
+        elif kind == "move":
+            _, source_index, target_index = op
+            for column in (self._source, self._page, self._row):
+                value = column.pop(source_index)
+                column.insert(target_index, value)
+
+    # Output
+
+    def describe(self):
+        """Page list in the form assemble_pages expects"""
+        pages = []
+        for source_id, page_num in zip(self._source, self._page):
+            kind, path = self.sources[source_id]
+            if kind == "pdf":
+                pages.append({'type': 'pdf', 'pdf_path': path, 'page_num': page_num})
+            else:
+                pages.append({'type': 'image', 'image_path': path})
+        return pages
+
+
+def inverse(op):
+    """The operation that undoes ``op``"""
+    if op[0] == "insert":
+        return ("delete",) + op[1:]
+    if op[0] == "delete":
+        return ("insert",) + op[1:]
+    return ("move", op[2], op[1])
+
+
+def focus_index(op, length):
+    """Where the UI should select after ``op`` was executed"""
+    if op[0] == "move":
+        return op[2]
+    if not length:
+        return None
+    return min(op[1], length - 1)
+
+
+def op_nbytes(op):
+    return sum(part.itemsize * len(part) for part in op if isinstance(part, array))
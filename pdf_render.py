@@ -0,0 +1,192 @@
+"""Page rendering shared by the GUI windows and their render workers.
+
+Nothing here touches Tk, so batches can run in worker processes: each batch
+covers pages of a single source, opens it once, consults the on-disk
+thumbnail cache and returns raw RGB thumbnails that the editor turns into
+PhotoImages on the main thread. Pages are rasterized straight at thumbnail
+resolution and wrapped from the pixmap samples, with no image encoding.
+
+The signer prefetches full-size page previews the same way, from worker
+processes that keep the document open between jobs.
+"""
+import fitz  # PyMuPDF
+from PIL import Image
+
+from pdf_jobs import NullContext
+from pdf_thumbcache import ThumbnailCache
+from pdf_trace import traced
+
+THUMBNAIL_SIZE = (150, 200)
+
+# Edge length in pixels of the square tiles used for zoomed-in page views
+TILE_SIZE = 512
+
+
+# Draft thumbnails are rendered at this fraction of the target resolution
+DRAFT_SCALE = 0.5
+
+
+def thumbnail_matrix(page, size, scale=1.0):
+    """Matrix that renders ``page`` to fit inside ``size`` pixels"""
+    rect = page.rect
+    zoom = min(size[0] / rect.width, size[1] / rect.height) * scale
+    return fitz.Matrix(zoom, zoom)
+
+
+def pixmap_image(pix):
+    """Wrap an RGB pixmap's samples as a PIL image without re-encoding"""
+    return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+
+@traced("render_thumbnail")
+def render_thumbnail(page, size=THUMBNAIL_SIZE, draft=False):
+    """Render a PyMuPDF page as a thumbnail of exactly ``size`` on white.
+
+    The page is rasterized directly at the thumbnail's resolution. A draft
+    renders at DRAFT_SCALE of that and is scaled up cheaply, to show
+    something quickly before the sharp version is ready.
+    """
+    scale = DRAFT_SCALE if draft else 1.0
+    pix = page.get_pixmap(matrix=thumbnail_matrix(page, size, scale),
+                          colorspace=fitz.csRGB, alpha=False)
+    img = pixmap_image(pix)
+    if draft:
+        img = img.resize((max(1, round(img.width / scale)), max(1, round(img.height / scale))),
+                         Image.Resampling.BILINEAR)
+    return fit_thumbnail(img, size)
+
+
+def image_thumbnail(image_path, size=THUMBNAIL_SIZE):
+    """Thumbnail of an image file of exactly ``size`` on white"""
+    with Image.open(image_path) as img:
+        # Let JPEGs decode at a reduced scale that still covers the thumbnail
+        img.draft("RGB", size)
+        return fit_thumbnail(img, size)
+
+
+def fit_thumbnail(img, size):
+    """Shrink an image into ``size`` and center it on a white background"""
+    # Resize to thumbnail size while maintaining aspect ratio
+    img.thumbnail(size, Image.Resampling.LANCZOS)
+
+    # Create a white background and paste the image centered
+    thumb = Image.new('RGB', size, 'white')
+    x = (size[0] - img.width) // 2
+    y = (size[1] - img.height) // 2
+    thumb.paste(img, (x, y))
+    return thumb
+
+
+@traced("render_thumbnail_batch")
+def render_thumbnail_batch(kind, path, page_nums, size=THUMBNAIL_SIZE, cache_dir=None,
+                           draft=False, ctx=None):
+    """Render thumbnails for pages of one source.
+
+    ``kind`` is 'pdf' or 'image' (images have the single page 0). Returns a
+    list of (page_num, rgb_bytes, from_cache) tuples; rgb_bytes is None when
+    a page could not be rendered. Fresh renders are written to the on-disk
+    cache in ``cache_dir`` (the default cache location when None). With
+    ``draft`` set, pages missing from the cache get quick low-resolution
+    renders that are not cached; cache hits are still returned sharp.
+    """
+    ctx = ctx or NullContext()
+    cache = worker_thumbnail_cache(cache_dir)
+    results = []
+    doc = None
+    try:
+        for page_num in page_nums:
+            ctx.check_cancelled()
+            thumb = cache.get(path, page_num, size)
+            if thumb is not None:
+                results.append((page_num, thumb.convert('RGB').tobytes(), True))
+                continue
+
+            try:
+                if kind == 'pdf':
+                    if doc is None:
+                        doc = fitz.open(path)
+                    thumb = render_thumbnail(doc[page_num], size, draft)
+                else:
+                    thumb = image_thumbnail(path, size)
+            except Exception as e:
+                print(f"Error generating thumbnail: {e}")
+                results.append((page_num, None, False))
+                continue
+
+            if not draft:
+                cache.put(path, page_num, size, thumb)
+            results.append((page_num, thumb.tobytes(), False))
+    finally:
+        if doc is not None:
+            doc.close()
+    return results
+
+
+# Thumbnail caches of this worker process by directory, kept between jobs
+_worker_caches = {}
+
+
+def worker_thumbnail_cache(cache_dir=None):
+    """One ThumbnailCache per process and directory, so its size is not re-measured per batch"""
+    cache = _worker_caches.get(cache_dir)
+    if cache is None:
+        cache = _worker_caches[cache_dir] = ThumbnailCache(cache_dir)
+    else:
+        cache.forget_fingerprints()  # Sources may have been saved since the last batch
+    return cache
+
+
+# Documents opened by this worker process, kept open between jobs
+_worker_documents = {}
+
+
+def worker_document(path):
+    """Open ``path`` once per process and reuse it for later jobs.
+
+    PyMuPDF objects cannot be shared between threads, so background page
+    renders run in worker processes, each with its own copy of the document.
+    """
+    doc = _worker_documents.get(path)
+    if doc is None:
+        doc = fitz.open(path)
+        _worker_documents[path] = doc
+    return doc
+
+
+def render_page(page, zoom):
+    """Render a whole page at ``zoom`` as an RGB PIL image"""
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csRGB, alpha=False)
+    return pixmap_image(pix)
+
+
+@traced("render_page_batch")
+def render_page_batch(path, requests, ctx=None):
+    """Render pages of ``path`` for a preview cache.
+
+    ``requests`` is a list of (page_num, zoom) pairs. Returns a list of
+    (page_num, zoom, (width, height), rgb_bytes) tuples, in request order.
+    """
+    ctx = ctx or NullContext()
+    doc = worker_document(path)
+    results = []
+    for page_num, zoom in requests:
+        ctx.check_cancelled()
+        img = render_page(doc[page_num], zoom)
+        results.append((page_num, zoom, img.size, img.tobytes()))
+    return results
+
+
+@traced("render_tile")
+def render_tile(display_list, zoom, column, row, tile_size=TILE_SIZE):
+    """Render one tile of a page at ``zoom`` from the page's display list.
+
+    Tile (column, row) covers pixels [column * tile_size, (column + 1) *
+    tile_size) of the zoomed page horizontally, and likewise vertically;
+    tiles on the right and bottom edges are smaller.
+    """
+    clip = fitz.Rect(column * tile_size / zoom, row * tile_size / zoom,
+                     (column + 1) * tile_size / zoom, (row + 1) * tile_size / zoom)
+    clip &= display_list.rect
+    pix = display_list.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csRGB,
+                                  alpha=False, clip=clip)
+    return pixmap_image(pix)
@@ -0,0 +1,229 @@
+"""Thumbnail caches: a persistent on-disk cache and an in-session memory cache.
+
+Entries live under ``$XDG_CACHE_HOME/pdf-wizard/thumbnails`` (or the
+platform equivalent) as PNG files named by a hash of the source file's
+fingerprint (resolved path, size and modification time), the page number
+and the thumbnail size, so editing a file invalidates its thumbnails. The
+cache is bounded by total bytes and evicts least recently used entries.
+
+RenderCache keeps decoded thumbnails in memory for the life of an editor
+session, keyed by page identity rather than position.
+"""
+import hashlib
+import os
+import sys
+from collections import OrderedDict
+
+from PIL import Image
+
+# Default upper bound for the cache directory
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# After eviction the cache is trimmed to this fraction of its bound
+EVICTION_TARGET = 0.9
+
+# Several processes write to one cache directory, so a cache re-measures it
+# after this many writes of its own instead of trusting its running total
+REMEASURE_WRITES = 500
+
+# Default upper bound for decoded thumbnails kept in memory per session
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+
+
+def default_cache_dir():
+    """Return the per-user cache directory for thumbnails"""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "pdf-wizard", "thumbnails")
+
+
+def file_fingerprint(path):
+    """Identify a file's current contents by resolved path, size and mtime"""
+    st = os.stat(path)
+    return f"{os.path.realpath(path)}|{st.st_size}|{st.st_mtime_ns}"
+
+
+class ThumbnailCache:
+    """Size-bounded LRU cache of thumbnail images on disk"""
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._total_bytes = None  # Measured lazily on the first write
+        self._fingerprints = {}
+
+    def key(self, path, page_num, size):
+        """Cache key for one page of one file at one thumbnail size"""
+        fingerprint = self._fingerprints.get(path)
+        if fingerprint is None:
+            fingerprint = file_fingerprint(path)
+            self._fingerprints[path] = fingerprint
+        raw = f"{fingerprint}|{page_num}|{size[0]}x{size[1]}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def forget_fingerprints(self):
+        """Re-stat source files on the next lookup (e.g. after they were saved)"""
+        self._fingerprints.clear()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".png")
+
+    def get(self, path, page_num, size):
+        """Return the cached thumbnail as a PIL image, or None on a miss"""
+        try:
+            entry = self._entry_path(self.key(path, page_num, size))
+            img = Image.open(entry)
+            img.load()
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        self.hits += 1
+        return img
+
+    def put(self, path, page_num, size, img):
+        """Store a thumbnail; failures are ignored since the cache is optional"""
+        try:
+            entry = self._entry_path(self.key(path, page_num, size))
+            os.makedirs(os.path.dirname(entry), exist_ok=True)
+            temp_entry = f"{entry}.{os.getpid()}.tmp"
+            img.save(temp_entry, "PNG")
+            os.replace(temp_entry, entry)
+        except OSError as e:
+            print(f"Could not write thumbnail cache entry: {e}")
+            return
+
+        self.writes += 1
+        if self._total_bytes is None or self.writes % REMEASURE_WRITES == 0:
+            self._total_bytes = self._measure()
+        else:
+            self._total_bytes += os.path.getsize(entry)
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        """Yield (path, size, mtime) for every cache entry"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for bucket in os.scandir(self.cache_dir):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith(".png"):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    yield entry.path, st.st_size, st.st_mtime
+
+    def _measure(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Delete least recently used entries until under the size target"""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICTION_TARGET
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._total_bytes = total
+
+    def clear(self):
+        """Remove every entry"""
+        for path, _, _ in list(self._entries()):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        self._total_bytes = 0
+
+    def record(self, hit):
+        """Count a lookup made against this cache by another process"""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats_text(self):
+        return (f"Thumbnail cache: {self.hits} hits, {self.misses} misses "
+                f"({self.hit_rate:.0%} hit rate)")
+
+
+def image_nbytes(img):
+    """Approximate memory held by a decoded PIL image"""
+    return img.width * img.height * len(img.getbands())
+
+
+class RenderCache:
+    """In-memory LRU of rendered thumbnails keyed by page identity.
+
+    Keys identify what was rendered (source path, page number and size), not
+    where the page sits in the editor, so thumbnails survive reorders,
+    inserts and deletes. Memory is bounded by ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        img = self._entries.get(key)
+        if img is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return img
+
+    def put(self, key, img):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.total_bytes -= image_nbytes(old)
+        self._entries[key] = img
+        self.total_bytes += image_nbytes(img)
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= image_nbytes(evicted)
+
+    def invalidate(self, path):
+        """Drop every entry rendered from ``path`` (e.g. after it changed)"""
+        for key in [key for key in self._entries if key[0] == path]:
+            self.total_bytes -= image_nbytes(self._entries.pop(key))
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
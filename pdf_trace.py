@@ -0,0 +1,265 @@
+"""Lightweight timing spans and optional profiling.
+
+Tracing is off by default, and then ``span`` and ``traced`` cost about one
+attribute lookup. To turn it on, set an environment variable before
+starting the GUI or CLI, or pass the CLI flags:
+
+- ``PDF_WIZARD_TRACE=trace.jsonl`` (``--trace FILE``): append one JSON object
+  per finished span to the file. Each object has the span's name, start time,
+  duration, process and thread ids, nesting depth and parent span, plus any
+  fields given when the span was opened.
+- ``PDF_WIZARD_PROFILE=cprofile``, ``tracemalloc`` or ``cprofile,tracemalloc``
+  (``--profile MODE``): also profile every outermost span.
+  ``PDF_WIZARD_PROFILE_DIR`` (default ``profiles``) receives a ``.prof``
+  file (load it with ``pstats`` or snakeviz) and a ``.txt`` summary per
+  operation.
+
+Worker processes inherit the environment, so their spans go to the same
+file. ``python -m pdf_trace trace.jsonl`` summarizes a trace per span name.
+"""
+import argparse
+import functools
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+TRACE_ENV = "PDF_WIZARD_TRACE"
+PROFILE_ENV = "PDF_WIZARD_PROFILE"
+PROFILE_DIR_ENV = "PDF_WIZARD_PROFILE_DIR"
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+# Lines of cProfile / tracemalloc output kept in the text summaries
+REPORT_LINES = 30
+
+
+class Tracer:
+    """Writes finished spans to a JSON-lines file and runs the profilers"""
+
+    def __init__(self, path=None, profile=(), profile_dir="profiles"):
+        self.path = path
+        self.profile = tuple(profile)
+        self.profile_dir = profile_dir
+        self.enabled = bool(path or self.profile)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.file = None
+        self.reports = 0
+
+    def stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def write(self, record):
+        if not self.path:
+            return
+        line = json.dumps(record, default=str) + "\n"
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.path, "a", encoding="utf-8")
+            self.file.write(line)
+            self.file.flush()
+
+
+class _NullSpan:
+    """What span returns while tracing is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+class Span:
+    """One timed region; ``set`` adds fields to its record before it closes"""
+
+    def __init__(self, tracer, name, fields):
+        self.tracer = tracer
+        self.name = name
+        self.fields = fields
+        self.profilers = None
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        stack = self.tracer.stack()
+        self.parent = stack[-1].name if stack else None
+        self.depth = len(stack)
+        stack.append(self)
+        if self.tracer.profile and self.depth == 0:
+            self.profilers = start_profilers(self.tracer.profile)
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        self.tracer.stack().pop()
+        record = {"name": self.name, "start": self.wall, "seconds": seconds, "pid": os.getpid(),
+                  "thread": threading.get_ident(), "depth": self.depth, "parent": self.parent}
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        if self.profilers is not None:
+            record["profile"] = stop_profilers(self.tracer, self.name, self.profilers)
+        record.update(self.fields)
+        self.tracer.write(record)
+        return False
+
+
+def start_profilers(modes):
+    profilers = {}
+    if "tracemalloc" in modes:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            profilers["tracemalloc"] = tracemalloc.take_snapshot()
+    if "cprofile" in modes:
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # Another profiler is already active (e.g. a nested thread)
+            pass
+        else:
+            profilers["cprofile"] = profiler
+    return profilers
+
+
+def stop_profilers(tracer, name, profilers):
+    """Write the profiles of one span and return their paths"""
+    os.makedirs(tracer.profile_dir, exist_ok=True)
+    tracer.reports += 1
+    base = os.path.join(tracer.profile_dir, f"{name.replace('/', '_')}-{os.getpid()}-{tracer.reports}")
+    paths = {}
+
+    profiler = profilers.get("cprofile")
+    if profiler is not None:
+        import pstats
+        profiler.disable()
+        profiler.dump_stats(base + ".prof")
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(REPORT_LINES)
+        with open(base + "-cprofile.txt", "w", encoding="utf-8") as f:
+            f.write(text.getvalue())
+        paths["cprofile"] = base + ".prof"
+
+    before = profilers.get("tracemalloc")
+    if before is not None:
+        import tracemalloc
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        with open(base + "-tracemalloc.txt", "w", encoding="utf-8") as f:
+            f.write(f"{name}: peak {peak / 1e6:.1f} MB traced, {current / 1e6:.1f} MB still allocated\n\n")
+            for stat in after.compare_to(before, "lineno")[:REPORT_LINES]:
+                f.write(f"{stat}\n")
+        paths["tracemalloc"] = base + "-tracemalloc.txt"
+    return paths
+
+
+def tracer_from_env():
+    profile = [mode.strip() for mode in os.environ.get(PROFILE_ENV, "").split(",") if mode.strip()]
+    unknown = [mode for mode in profile if mode not in PROFILE_MODES]
+    if unknown:
+        print(f"Ignoring unknown {PROFILE_ENV} mode(s): {', '.join(unknown)}")
+        profile = [mode for mode in profile if mode in PROFILE_MODES]
+    return Tracer(os.environ.get(TRACE_ENV) or None, profile, os.environ.get(PROFILE_DIR_ENV, "profiles"))
+
+
+_tracer = tracer_from_env()
+_null_span = _NullSpan()
+
+
+def configure(path=None, profile=None, profile_dir=None):
+    """Turn tracing on from code (e.g. command-line flags).
+
+    The settings are also put in the environment so that worker processes
+    started afterwards trace to the same file.
+    """
+    global _tracer
+    if path:
+        os.environ[TRACE_ENV] = os.path.abspath(path)
+    if profile:
+        os.environ[PROFILE_ENV] = profile
+    if profile_dir:
+        os.environ[PROFILE_DIR_ENV] = os.path.abspath(profile_dir)
+    _tracer = tracer_from_env()
+
+
+def enabled():
+    return _tracer.enabled
+
+
+def span(name, **fields):
+    """Context manager timing the with-block as span ``name``"""
+    if not _tracer.enabled:
+        return _null_span
+    return Span(_tracer, name, fields)
+
+
+def emit(name, start, seconds, **fields):
+    """Record a span timed by the caller, e.g. one that spans several callbacks"""
+    if not _tracer.enabled:
+        return
+    record = {"name": name, "start": start, "seconds": seconds, "pid": os.getpid(),
+              "thread": threading.get_ident(), "depth": 0, "parent": None}
+    record.update(fields)
+    _tracer.write(record)
+
+
+def traced(name=None):
+    """Decorator wrapping every call of a function in a span"""
+    def decorate(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return func(*args, **kwargs)
+            with Span(_tracer, span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def summarize(path):
+    """Per-span-name count, total, mean and max seconds from a trace file"""
+    totals = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            entry = totals.setdefault(record["name"], [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += record["seconds"]
+            entry[2] = max(entry[2], record["seconds"])
+    lines = [f"{'span':40} {'count':>7} {'total':>10} {'mean':>10} {'max':>10}"]
+    for name, (count, total, longest) in sorted(totals.items(), key=lambda item: -item[1][1]):
+        lines.append(f"{name[:40]:40} {count:7d} {total:9.3f}s {total / count * 1000:8.2f}ms "
+                     f"{longest * 1000:8.2f}ms")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pdf_trace",
+                                     description="Summarize a PDF Wizard trace file per span name.")
+    parser.add_argument("trace", help="JSON-lines file written with PDF_WIZARD_TRACE or --trace")
+    args = parser.parse_args(argv)
+    print(summarize(args.trace))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
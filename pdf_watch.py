@@ -0,0 +1,349 @@
+"""Watch folders and merge or reverse PDFs as they arrive.
+
+Scanners drop files into shared folders; this long-running process polls the
+configured folders, waits until each new file is complete, and runs the
+folder's operation on it in a pool of worker processes:
+
+- ``reverse``: every file is reversed into the output folder.
+- ``merge``: files are grouped by the ``group`` pattern (by default the part of
+  the name before the first ``_``). Once a group has had no new files
+  for ``group_settle`` seconds, it is merged in name order into ``<group>.pdf``.
+
+A file counts as complete once its size and modification time have stayed
+the same for ``settle`` seconds and it ends with ``%%EOF``. Every processed
+file is recorded in an append-only journal (one JSON object per line), keyed
+by path, size and modification time. After a restart, recorded files are
+skipped, and a file that is replaced with new content is processed again.
+
+The configuration is JSON, or YAML when PyYAML is installed::
+
+    {
+      "poll_interval": 2, "settle": 5, "workers": 2, "journal": "watch-journal.jsonl",
+      "folders": [
+        {"path": "scans/duplex", "operation": "reverse", "output": "out/reversed"},
+        {"path": "scans/batches", "operation": "merge", "group": "^(.+?)_", "output": "out/merged"}
+      ]
+    }
+
+Command line usage::
+
+    python -m pdf_watch watch.json
+    python -m pdf_watch --reverse scans/duplex out/reversed
+"""
+import argparse
+import json
+import os
+import re
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pdf_batch import load_config_file, run_job
+from pdf_core import DEFAULT_REVERSE_SUFFIX, batch_output_path
+from pdf_jobs import PART_SUFFIX
+
+DEFAULT_POLL_INTERVAL = 2.0
+
+# A file must be unchanged for this many seconds before it is processed
+DEFAULT_SETTLE = 5.0
+
+# A merge group is closed once it has had no new files for this many seconds
+DEFAULT_GROUP_SETTLE = 30.0
+
+DEFAULT_GROUP_PATTERN = r"^(.+?)_"
+
+# Complete PDFs end with %%EOF, possibly followed by a little whitespace
+EOF_MARKER = b"%%EOF"
+EOF_TAIL_BYTES = 1024
+
+
+def file_key(path, stat):
+    """Journal key identifying one version of a file"""
+    return f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def has_eof_marker(path):
+    """True when the end of the file has a %%EOF marker"""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - EOF_TAIL_BYTES))
+            return EOF_MARKER in f.read()
+    except OSError:
+        return False
+
+
+class Journal:
+    """Append-only record of processed files, reloaded on start-up"""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = {}  # file key -> entry
+        self.outputs = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.remember(json.loads(line))
+                    except ValueError:
+                        pass  # A line cut short by a crash
+
+    def remember(self, entry):
+        for key in entry["keys"]:
+            self.done[key] = entry
+        if entry.get("output"):
+            self.outputs.add(os.path.abspath(entry["output"]))
+
+    def __contains__(self, key):
+        return key in self.done
+
+    def record(self, entry):
+        """Add an entry and make sure it is on disk before returning"""
+        self.remember(entry)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class FolderRule:
+    """One watched folder and what to do with the files dropped into it"""
+
+    def __init__(self, path, operation="reverse", output=None, group=DEFAULT_GROUP_PATTERN,
+                 group_settle=DEFAULT_GROUP_SETTLE, suffix=DEFAULT_REVERSE_SUFFIX, settle=None):
+        if operation not in ("reverse", "merge"):
+            raise ValueError(f"{path}: operation must be 'reverse' or 'merge', not {operation!r}")
+        self.path = path
+        self.operation = operation
+        self.output = output or path
+        self.group = re.compile(group)
+        self.group_settle = group_settle
+        self.suffix = suffix
+        self.settle = settle
+
+    def group_name(self, path):
+        """Merge group of a file, or its stem when the pattern does not match"""
+        stem = os.path.splitext(os.path.basename(path))[0]
+        match = self.group.search(stem)
+        return (match.group(1) if match and match.groups() else match.group(0) if match else stem)
+
+
+class FolderWatcher:
+    """Poll folders, debounce new files and run their jobs on a process pool"""
+
+    def __init__(self, rules, journal, workers=None, settle=DEFAULT_SETTLE,
+                 poll_interval=DEFAULT_POLL_INTERVAL):
+        self.rules = rules
+        self.journal = journal
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.pool = ProcessPoolExecutor(max_workers=max(1, workers or os.cpu_count() or 1))
+        self.observed = {}  # path -> (size, mtime_ns, first seen with that size/mtime)
+        self.in_flight = {}  # future -> (job, input paths, file keys)
+        self.busy = set()  # inputs and outputs of running jobs
+        self.stalled = set()  # Incomplete files already reported
+        self.draining = False  # Set by run(once=True): don't wait for merge groups to go quiet
+
+    def scan(self, rule, now):
+        """Return (stable, settling, stalled) new PDFs in rule's folder.
+
+        ``stable`` holds (path, journal key, stat) for complete files,
+        ``settling`` the paths of files that may still be being written and
+        ``stalled`` those that stopped changing without a %%EOF marker.
+        """
+        try:
+            names = sorted(os.listdir(rule.path))
+        except OSError as e:
+            print(f"Cannot read {rule.path}: {e}")
+            return [], [], []
+
+        stable = []
+        settling = []
+        stalled = []
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            if ext.lower() != ".pdf" or name.startswith(".") or stem.endswith(rule.suffix):
+                continue
+            path = os.path.join(rule.path, name)
+            if path in self.busy or os.path.abspath(path) in self.journal.outputs:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Removed since listdir
+            key = file_key(path, stat)
+            if key in self.journal:
+                continue
+
+            seen = self.observed.get(path)
+            if seen is None or seen[:2] != (stat.st_size, stat.st_mtime_ns):
+                # New or still growing: start the settle clock again
+                self.observed[path] = (stat.st_size, stat.st_mtime_ns, now)
+                settling.append(path)
+                continue
+            settle = self.settle if rule.settle is None else rule.settle
+            if now - seen[2] < settle or now - stat.st_mtime < settle:
+                settling.append(path)
+            elif has_eof_marker(path):
+                stable.append((path, key, stat))
+            else:
+                stalled.append(path)
+        return stable, settling, stalled
+
+    def jobs_for(self, rule, stable, settling, now):
+        """Turn stable files into run_job jobs: (job, paths, file keys)"""
+        if rule.operation == "reverse":
+            return [({"id": os.path.basename(path), "type": "reverse", "input": path,
+                      "output": batch_output_path(path, rule.output, rule.suffix)}, [path], [key])
+                    for path, key, _ in stable]
+
+        groups = {}
+        for path, key, stat in stable:
+            groups.setdefault(rule.group_name(path), []).append((path, key, stat))
+        incomplete = {rule.group_name(path) for path in settling}
+        jobs = []
+        for name, files in groups.items():
+            # Wait until every member is complete and no new member has arrived for a while
+            if name in incomplete:
+                continue
+            if not self.draining and now - max(stat.st_mtime for _, _, stat in files) < rule.group_settle:
+                continue
+            jobs.append(({"id": name, "type": "merge", "inputs": [path for path, _, _ in files],
+                          "output": self.unique_output(os.path.join(rule.output, f"{name}.pdf"))},
+                         [path for path, _, _ in files], [key for _, key, _ in files]))
+        return jobs
+
+    def unique_output(self, path):
+        """path, or path with -2, -3, ... when an earlier group already used it"""
+        stem, ext = os.path.splitext(path)
+        candidate, number = path, 1
+        while os.path.exists(candidate) or os.path.exists(candidate + PART_SUFFIX):
+            number += 1
+            candidate = f"{stem}-{number}{ext}"
+        return candidate
+
+    def collect(self):
+        """Record finished jobs in the journal"""
+        for future in [future for future in self.in_flight if future.done()]:
+            job, paths, keys = self.in_flight.pop(future)
+            self.busy.difference_update(paths + [job["output"]])
+            for path in paths:
+                self.observed.pop(path, None)
+            try:
+                record = future.result()
+            except Exception as e:  # The worker process died
+                record = {"status": "failed", "error": str(e), "seconds": 0.0}
+            self.journal.record({"keys": keys, "inputs": paths, "operation": job["type"],
+                                 "output": job["output"], "status": record["status"],
+                                 "error": record["error"], "seconds": round(record["seconds"], 3),
+                                 "time": time.time()})
+            outcome = "failed: " + record["error"] if record["error"] else f"{record['seconds']:.2f}s"
+            print(f"{job['type']} {', '.join(os.path.basename(p) for p in paths)} -> {job['output']} ({outcome})")
+
+    def poll(self):
+        """One pass: collect finished jobs and start jobs for newly complete files.
+
+        Returns the number of files that are new but not yet being processed.
+        """
+        self.collect()
+        now = time.time()
+        waiting = 0
+        for rule in self.rules:
+            stable, settling, stalled = self.scan(rule, now)
+            for path in stalled:
+                if path not in self.stalled:
+                    print(f"Waiting for {path}: it has stopped growing but does not end with %%EOF")
+            self.stalled.update(stalled)
+            # When draining, an incomplete file no longer holds back the rest of its group
+            jobs = self.jobs_for(rule, stable, settling if self.draining else settling + stalled, now)
+            waiting += len(stable) + len(settling) - sum(len(paths) for _, paths, _ in jobs)
+            for job, paths, keys in jobs:
+                self.busy.update(paths + [job["output"]])
+                self.in_flight[self.pool.submit(run_job, job)] = (job, paths, keys)
+        return waiting
+
+    def run(self, once=False):
+        """Poll until interrupted (or, with ``once``, until the current files are done)"""
+        self.draining = once
+        try:
+            while True:
+                waiting = self.poll()
+                if once and not waiting and not self.in_flight:
+                    return
+                time.sleep(self.poll_interval)
+        finally:
+            self.pool.shutdown(wait=True)
+            self.collect()
+
+
+def load_watch_config(path):
+    """Build (rules, options) from a watch configuration file"""
+    config = load_config_file(path)
+    if not isinstance(config, dict):
+        raise ValueError(f"{path} is not a mapping")
+    base_dir = os.path.dirname(os.path.abspath(path))
+    rules = []
+    for folder in config.get("folders") or []:
+        folder = dict(folder)
+        folder["path"] = os.path.join(base_dir, folder["path"])
+        if folder.get("output"):
+            folder["output"] = os.path.join(base_dir, folder["output"])
+        rules.append(FolderRule(**folder))
+    if not rules:
+        raise ValueError(f"{path} does not list any folders")
+    options = {key: config[key] for key in ("workers", "settle", "poll_interval") if key in config}
+    journal = config.get("journal", "watch-journal.jsonl")
+    options["journal"] = os.path.join(base_dir, journal)
+    return rules, options
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m pdf_watch",
+                                     description="Merge or reverse PDFs dropped into watched folders.")
+    parser.add_argument("config", nargs="?", help="watch configuration (.json, .yaml or .yml)")
+    parser.add_argument("--reverse", nargs=2, metavar=("FOLDER", "OUTPUT"),
+                        help="reverse every PDF dropped into FOLDER into OUTPUT")
+    parser.add_argument("--merge", nargs=2, metavar=("FOLDER", "OUTPUT"),
+                        help="merge PDFs dropped into FOLDER by name prefix into OUTPUT")
+    parser.add_argument("--journal", help="journal file (default: from config, else watch-journal.jsonl)")
+    parser.add_argument("-j", "--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--settle", type=float, help=f"seconds a file must be unchanged (default: {DEFAULT_SETTLE:g})")
+    parser.add_argument("--poll-interval", type=float, help=f"seconds between scans (default: {DEFAULT_POLL_INTERVAL:g})")
+    parser.add_argument("--once", action="store_true", help="process what is there now, then exit")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        rules, options = load_watch_config(args.config) if args.config else ([], {})
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.reverse:
+        rules.append(FolderRule(args.reverse[0], "reverse", args.reverse[1]))
+    if args.merge:
+        rules.append(FolderRule(args.merge[0], "merge", args.merge[1]))
+    if not rules:
+        parser.error("give a configuration file, --reverse or --merge")
+    for key in ("workers", "settle", "poll_interval", "journal"):
+        if getattr(args, key) is not None:
+            options[key] = getattr(args, key)
+
+    journal = Journal(options.pop("journal", "watch-journal.jsonl"))
+    watcher = FolderWatcher(rules, journal, **options)
+    # Stop like Ctrl+C when a service manager asks, so running jobs are still journaled
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Watching {', '.join(rule.path for rule in rules)} (Ctrl+C to stop)")
+    try:
+        watcher.run(once=args.once)
+    except KeyboardInterrupt:
+        print("Stopping; waiting for running jobs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
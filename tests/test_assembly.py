@@ -0,0 +1,54 @@
+from pdf_assembly import PageRun, plan_runs, source_paths
+
+
+def pdf(path, page_num):
+    return {'type': 'pdf', 'pdf_path': path, 'page_num': page_num}
+
+
+def image(path):
+    return {'type': 'image', 'image_path': path}
+
+
+def runs_of(pages):
+    return [(run.type, run.path, run.start, run.end) for run in plan_runs(pages)]
+
+
+def test_consecutive_pages_form_one_run():
+    assert runs_of([pdf("a.pdf", n) for n in range(4)]) == [('pdf', 'a.pdf', 0, 3)]
+
+
+def test_reverse_order_forms_one_run():
+    runs = plan_runs([pdf("a.pdf", n) for n in (5, 4, 3)])
+    assert len(runs) == 1
+    assert runs[0].step == -1
+    assert list(runs[0].page_numbers) == [5, 4, 3]
+    assert len(runs[0]) == 3
+
+
+def test_direction_change_starts_a_new_run():
+    pages = [pdf("a.pdf", n) for n in (0, 1, 2, 1, 0)]
+    assert runs_of(pages) == [('pdf', 'a.pdf', 0, 2), ('pdf', 'a.pdf', 1, 0)]
+
+
+def test_gaps_repeats_and_sources_break_runs():
+    pages = [pdf("a.pdf", 0), pdf("a.pdf", 2), pdf("a.pdf", 2), pdf("b.pdf", 3), pdf("a.pdf", 3)]
+    assert runs_of(pages) == [
+        ('pdf', 'a.pdf', 0, 0), ('pdf', 'a.pdf', 2, 2), ('pdf', 'a.pdf', 2, 2),
+        ('pdf', 'b.pdf', 3, 3), ('pdf', 'a.pdf', 3, 3)]
+
+
+def test_images_are_single_page_runs():
+    pages = [pdf("a.pdf", 0), image("x.png"), image("x.png"), pdf("a.pdf", 1)]
+    assert runs_of(pages) == [
+        ('pdf', 'a.pdf', 0, 0), ('image', 'x.png', 0, 0), ('image', 'x.png', 0, 0),
+        ('pdf', 'a.pdf', 1, 1)]
+
+
+def test_source_paths_in_first_use_order():
+    runs = plan_runs([pdf("b.pdf", 0), image("x.png"), pdf("a.pdf", 0), pdf("b.pdf", 5)])
+    assert source_paths(runs) == ["b.pdf", "a.pdf"]
+
+
+def test_empty_page_list():
+    assert plan_runs([]) == []
+    assert repr(PageRun('image', 'x.png')) == "PageRun(image 'x.png')"
@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+from pdf_batch import ManifestError, load_manifest, plan_jobs
+
+
+def ids(jobs):
+    return [job["id"] for job in jobs]
+
+
+def test_default_ids_and_paths_resolved_against_base_dir():
+    jobs = plan_jobs([
+        {"type": "merge", "inputs": ["a.pdf", "b.pdf"], "output": "ab.pdf"},
+        {"type": "reorder", "pages": ["ab.pdf:2,1", "cover.jpg"], "output": "pick.pdf"},
+    ], base_dir="/work")
+    assert ids(jobs) == ["job1", "job2"]
+    assert jobs[0]["inputs"] == [os.path.join("/work", "a.pdf"), os.path.join("/work", "b.pdf")]
+    assert jobs[1]["pages"] == [os.path.join("/work", "ab.pdf") + ":2,1", os.path.join("/work", "cover.jpg")]
+
+
+def test_jobs_reading_an_output_run_after_its_producer():
+    jobs = plan_jobs([
+        {"id": "sign", "type": "sign", "input": "rev.pdf", "image": "sig.png", "at": "1:0,0,10,10",
+         "output": "signed.pdf"},
+        {"id": "rev", "type": "reverse", "input": "book.pdf", "output": "rev.pdf"},
+        {"id": "book", "type": "merge", "inputs": ["a.pdf"], "output": "book.pdf"},
+    ])
+    assert ids(jobs) == ["book", "rev", "sign"]
+    by_id = {job["id"]: job for job in jobs}
+    assert by_id["sign"]["deps"] == ["rev"]
+    assert by_id["rev"]["deps"] == ["book"]
+    assert by_id["book"]["deps"] == []
+    assert by_id["sign"]["at"] == ["1:0,0,10,10"]
+
+
+def test_after_and_implicit_dependencies_are_combined():
+    jobs = plan_jobs([
+        {"id": "x", "type": "reverse", "input": "a.pdf", "output": "x.pdf"},
+        {"id": "y", "type": "reverse", "input": "b.pdf", "output": "y.pdf"},
+        {"id": "z", "type": "merge", "inputs": ["x.pdf", "x.pdf"], "output": "z.pdf", "after": ["y", "x"]},
+    ])
+    assert jobs[-1]["deps"] == ["y", "x"]
+
+
+def test_a_job_reading_its_own_output_does_not_depend_on_itself():
+    jobs = plan_jobs([{"id": "a", "type": "reverse", "input": "a.pdf", "output": "a.pdf"}])
+    assert jobs[0]["deps"] == []
+
+
+def test_cycle_is_reported():
+    with pytest.raises(ManifestError, match="Dependency cycle: a -> b -> a"):
+        plan_jobs([
+            {"id": "a", "type": "reverse", "input": "b.pdf", "output": "a.pdf"},
+            {"id": "b", "type": "reverse", "input": "a.pdf", "output": "b.pdf"},
+        ])
+
+
+@pytest.mark.parametrize("jobs, message", [
+    ([{"id": "a", "type": "reverse", "input": "x", "output": "y"}] * 2, "Duplicate job id 'a'"),
+    ([{"type": "split", "output": "y"}], "type must be one of"),
+    ([{"type": "merge", "output": "y"}], r"\(merge\) is missing inputs"),
+    ([{"type": "merge", "inputs": [], "output": "y", "optimize": "huge"}], "optimize must be one of"),
+    ([{"type": "reverse", "input": "x", "output": "y", "after": ["nope"]}], "unknown job"),
+    (["a"], "Job 1 must be a mapping"),
+    ("a", "jobs must be a list"),
+])
+def test_invalid_jobs(jobs, message):
+    with pytest.raises(ManifestError, match=message):
+        plan_jobs(jobs)
+
+
+def test_load_manifest_accepts_a_list_and_resolves_the_report(tmp_path):
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps([{"type": "reverse", "input": "a.pdf", "output": "b.pdf"}]))
+    manifest = load_manifest(str(path))
+    assert manifest["jobs"][0]["output"] == str(tmp_path / "b.pdf")
+
+    path.write_text(json.dumps({"report": "report.json", "jobs": []}))
+    assert load_manifest(str(path))["report"] == str(tmp_path / "report.json")
+
+
+@pytest.mark.parametrize("content, message", [("null", "is empty"), ("3", "got int"), ('"x"', "got str")])
+def test_load_manifest_rejects_other_top_levels(tmp_path, content, message):
+    path = tmp_path / "jobs.json"
+    path.write_text(content)
+    with pytest.raises(ManifestError, match=message):
+        load_manifest(str(path))
@@ -0,0 +1,107 @@
+import re
+
+import fitz  # PyMuPDF
+import pytest
+from PyPDF2 import PdfReader
+
+from pdf_incremental import can_append, last_xref_offset, save_incremental, subsections
+
+
+def xref_table_pdf(path, pages=3):
+    """A PDF written by MuPDF, which uses a classic xref table"""
+    with fitz.open() as doc:
+        for number in range(pages):
+            doc.new_page().insert_text((72, 72), f"Page {number + 1}")
+        doc.save(str(path))
+
+
+def xref_stream_pdf(path, pages=3):
+    """A minimal PDF whose only cross-reference section is an xref stream"""
+    kids = " ".join(f"{3 + 2 * n} 0 R" for n in range(pages))
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>",
+               f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode()]
+    for number in range(pages):
+        content = f"BT /F1 12 Tf 72 720 Td (Page {number + 1}) Tj ET".encode()
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * number} 0 R "
+                       f"/Resources << /Font << /F1 << /Type /Font /Subtype /Type1 /BaseFont /Helvetica >> >> >> >>"
+                       .encode())
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+
+    data = bytearray(b"%PDF-1.5\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_number = len(objects) + 1
+    offsets.append(len(data))
+    rows = b"\x00\x00\x00\x00\xff\xff" + b"".join(b"\x01" + ofs.to_bytes(4, "big") + b"\x00" for ofs in offsets)
+    data += (b"%d 0 obj\n<< /Type /XRef /Size %d /Root 1 0 R /W [1 4 1] /Length %d >>\nstream\n"
+             % (xref_number, xref_number + 1, len(rows)) + rows + b"\nendstream\nendobj\n")
+    data += b"startxref\n%d\n%%%%EOF\n" % offsets[-1]
+    path.write_bytes(bytes(data))
+
+
+@pytest.fixture(params=["table", "stream"])
+def original(request, tmp_path):
+    path = tmp_path / f"{request.param}.pdf"
+    (xref_table_pdf if request.param == "table" else xref_stream_pdf)(path)
+    assert last_xref_offset(str(path))[1] == (request.param == "stream")
+    return path
+
+
+def page_texts(reader):
+    return [page.extract_text().strip() for page in reader.pages]
+
+
+def test_appended_update_keeps_the_original_and_parses_strictly(original):
+    before = original.read_bytes()
+    prev, was_stream = last_xref_offset(str(original))
+
+    doc = fitz.open(str(original))
+    try:
+        assert can_append(doc)
+        doc[1].insert_text((72, 200), "Signed")
+        appended = save_incremental(doc)
+    finally:
+        doc.close()
+
+    after = original.read_bytes()
+    assert after.startswith(before)
+    assert len(after) - len(before) == appended > 0
+
+    # The new section is the same kind as the original and points back to it
+    offset, is_stream = last_xref_offset(str(original))
+    assert offset >= len(before)
+    assert is_stream == was_stream
+    assert int(re.findall(rb"/Prev (\d+)", after[len(before):])[-1]) == prev
+
+    reader = PdfReader(str(original), strict=True)
+    texts = page_texts(reader)
+    assert len(texts) == 3
+    assert "Signed" in texts[1]
+    assert "Signed" not in texts[0] + texts[2]
+    with fitz.open(str(original)) as doc:
+        assert "Signed" in doc[1].get_text()
+
+
+def test_reordering_pages(original):
+    doc = fitz.open(str(original))
+    try:
+        doc.select([2, 1, 0])
+        save_incremental(doc)
+    finally:
+        doc.close()
+    texts = page_texts(PdfReader(str(original), strict=True))
+    assert [text.split()[-1] for text in texts] == ["3", "2", "1"]
+
+
+def test_no_changes_append_nothing(original):
+    before = original.read_bytes()
+    with fitz.open(str(original)) as doc:
+        assert save_incremental(doc) == 0
+    assert original.read_bytes() == before
+
+
+def test_subsections():
+    assert subsections([]) == []
+    assert subsections([0, 1, 2, 5, 7, 8]) == [[0, 3], [5, 1], [7, 2]]
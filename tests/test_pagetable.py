@@ -0,0 +1,143 @@
+import random
+
+import pdf_pagetable
+from pdf_pagetable import PageTable, focus_index, inverse
+
+
+def snapshot(table):
+    return [(page.row, page.type, page.path, page.page_num) for page in table]
+
+
+def make_table(pages=5):
+    table = PageTable()
+    table.append("pdf", "a.pdf", range(pages), record=False)
+    return table
+
+
+def test_insert_interns_sources():
+    table = PageTable()
+    table.append("pdf", "a.pdf", [0, 1])
+    table.append("image", "logo.png", [0])
+    table.insert(1, "pdf", "a.pdf", [5])
+    assert table.sources == [("pdf", "a.pdf"), ("image", "logo.png")]
+    assert [(page.path, page.page_num) for page in table] == [
+        ("a.pdf", 0), ("a.pdf", 5), ("a.pdf", 1), ("logo.png", 0)]
+    assert table[-1].type == "image"
+
+
+def test_rows_stay_with_pages():
+    table = make_table()
+    rows = [page.row for page in table]
+    table.move(0, 4)
+    table.delete(1)
+    assert [page.row for page in table] == [rows[1], rows[3], rows[4], rows[0]]
+    table.append("pdf", "b.pdf", [0])
+    assert table[-1].row not in rows
+
+
+def test_describe():
+    table = PageTable()
+    table.append("pdf", "a.pdf", [2])
+    table.append("image", "logo.png", [0])
+    assert table.describe() == [
+        {'type': 'pdf', 'pdf_path': 'a.pdf', 'page_num': 2},
+        {'type': 'image', 'image_path': 'logo.png'},
+    ]
+
+
+def test_undo_redo_delete():
+    table = make_table()
+    before = snapshot(table)
+    table.delete(1, 3)
+    after = snapshot(table)
+    assert len(table) == 2
+    assert table.undo() == 1
+    assert snapshot(table) == before
+    assert table.redo() == 1
+    assert snapshot(table) == after
+
+
+def test_undo_redo_insert_and_move():
+    table = make_table()
+    before = snapshot(table)
+    table.insert(2, "pdf", "b.pdf", [0, 1])
+    table.move(0, 6)
+    moved = snapshot(table)
+    assert table.undo() == 0
+    assert table.undo() == 2
+    assert snapshot(table) == before
+    assert table.redo() == 2
+    assert table.redo() == 6
+    assert snapshot(table) == moved
+
+
+def test_history_flags():
+    table = make_table()
+    assert not table.can_undo and not table.can_redo
+    assert table.undo() is None and table.redo() is None
+    table.delete(0)
+    assert table.can_undo and not table.can_redo
+    table.undo()
+    assert table.can_redo
+    table.move(0, 1)
+    assert not table.can_redo
+    table.clear_history()
+    assert not table.can_undo
+
+
+def test_unrecorded_edits_are_not_undone():
+    table = make_table(2)
+    assert not table.can_undo
+    table.move(0, 0)
+    assert not table.can_undo
+
+
+def test_undo_limit(monkeypatch):
+    monkeypatch.setattr(pdf_pagetable, "UNDO_LIMIT", 3)
+    table = make_table()
+    for _ in range(5):
+        table.move(0, 4)
+    undone = 0
+    while table.undo() is not None:
+        undone += 1
+    assert undone == 3
+
+
+def test_inverse_round_trip():
+    table = make_table()
+    table.delete(1, 2)
+    table.move(0, 2)
+    table.insert(1, "pdf", "b.pdf", [7])
+    for op in table._undo:
+        assert inverse(inverse(op)) == op
+
+
+def test_focus_index():
+    assert focus_index(("move", 3, 1), 5) == 1
+    assert focus_index(("delete", 4, None, None, None), 4) == 3
+    assert focus_index(("delete", 0, None, None, None), 0) is None
+
+
+def test_random_edits_undo_and_redo_exactly():
+    rng = random.Random(1234)
+    table = make_table(20)
+    states = [snapshot(table)]
+    for _ in range(200):
+        choice = rng.random()
+        if choice < 0.3 or len(table) < 2:
+            table.insert(rng.randint(0, len(table)), "pdf", rng.choice(["a.pdf", "b.pdf"]),
+                         [rng.randint(0, 99) for _ in range(rng.randint(1, 3))])
+        elif choice < 0.6:
+            index = rng.randrange(len(table))
+            table.delete(index, rng.randint(1, min(3, len(table) - index)))
+        else:
+            table.move(rng.randrange(len(table)), rng.randrange(len(table)))
+        if snapshot(table) != states[-1]:
+            states.append(snapshot(table))
+
+    for state in reversed(states[:-1]):
+        table.undo()
+        assert snapshot(table) == state
+    for state in states[1:]:
+        table.redo()
+        assert snapshot(table) == state